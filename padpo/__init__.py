@@ -0,0 +1,5 @@
+"""Linter for gettext files (`*.po`)."""
+
+from padpo.api import Result, lint
+
+__all__ = ["Result", "lint"]
@@ -0,0 +1,95 @@
+"""Library API: check `*.po` files and get structured results, without logging."""
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from padpo.checkers import create_checkers
+from padpo.padpo import bounded_map, check_pofile, parse_and_check, po_file_paths
+from padpo.pofile import Error, Message, PoFile
+
+
+class Result(NamedTuple):
+    """Message of a checker about an item of a `*.po` file."""
+
+    path: str
+    line: int  # first line of the item
+    level: str  # "error" or "warning"
+    checker: str  # name of the checker
+    rule: str  # code of the rule, see `Checker.rules`
+    message: Message
+
+    @property
+    def text(self) -> str:
+        """Text of the message (rendered on access)."""
+        return self.message.text
+
+
+@functools.lru_cache(maxsize=None)
+def default_checkers() -> tuple:
+    """Return the checkers used by `lint`, with their default configuration."""
+    return tuple(create_checkers())
+
+
+def results(pofile: PoFile) -> Iterator[Result]:
+    """Yield the results of a checked file."""
+    path = str(pofile.path)
+    for item in pofile.content:
+        for message in item.warnings:
+            yield Result(
+                path,
+                item.lineno_start,
+                "error" if isinstance(message, Error) else "warning",
+                message.checker_name,
+                message.rule,
+                message,
+            )
+
+
+def lint(
+    source,
+    checkers=None,
+    jobs: int = 1,
+    suppressions=None,
+    path: Optional[str] = None,
+) -> Iterator[Result]:
+    """
+    Check `*.po` files, yield results file by file.
+
+    `source` is either the content of a `*.po` file (bytes or a text stream),
+    or a path or a list of paths of files or directories (searched
+    recursively, `-` being the standard input). `path` is the name given to
+    content in results.
+
+    Checkers (all the checkers with their default configuration by default)
+    are shared by the `jobs` threads checking the files. Nothing is logged.
+    """
+    if checkers is None:
+        checkers = default_checkers()
+    if isinstance(source, (bytes, bytearray)) or hasattr(source, "read"):
+        if hasattr(source, "read"):
+            pofile = PoFile.from_stream(source, path or "<stream>")
+        else:
+            pofile = PoFile.from_bytes(bytes(source), path or "<bytes>")
+        if suppressions:
+            suppressions.apply(pofile)
+        yield from results(check_pofile(pofile, checkers))
+        return
+    if isinstance(source, (str, Path)):
+        source = [source]
+    check = functools.partial(
+        parse_and_check, suppressions=suppressions, checkers=checkers
+    )
+    filepaths = po_file_paths(source)
+    pool = ThreadPoolExecutor(jobs) if jobs > 1 else None
+    try:
+        if pool:
+            pofiles = bounded_map(pool, check, filepaths, 2 * jobs)
+        else:
+            pofiles = map(check, filepaths)
+        for pofile in pofiles:
+            yield from results(pofile)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,168 @@
+"""Run expensive calls in child processes, within time and memory budgets."""
+
+import contextlib
+import multiprocessing
+import threading
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+import simplelogging
+
+log = simplelogging.get_logger()
+
+# spawn (not fork): calls are made from the threads checking files
+CONTEXT = multiprocessing.get_context("spawn")
+
+
+class BudgetExceeded(Exception):
+    """A call was stopped because it exceeded its budget."""
+
+    def __init__(self, reason: str):
+        """Initializer."""
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _call(function, *args) -> tuple:
+    """Return (status, value) of a call made in the child process."""
+    try:
+        return "ok", function(*args)
+    except MemoryError:
+        return "memory", None
+    except Exception as exc:
+        return "error", f"{type(exc).__name__}: {exc}"
+
+
+def _serve(connection, initializer, memory: Optional[int]) -> None:
+    """Run the calls received by a worker process, send back their results."""
+    if memory and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    status, value = _call(initializer) if initializer else ("ok", None)
+    connection.send((status, value))
+    while status == "ok":
+        try:
+            function, argument = connection.recv()
+        except EOFError:  # the pool is closed
+            break
+        result = _call(function, argument)
+        try:
+            connection.send(result)
+        except MemoryError:
+            connection.send(("memory", None))
+    connection.close()
+
+
+class Worker:
+    """
+    Child process running calls one at a time.
+
+    The process is started (and `initializer` is called) before the first
+    call, so that its startup does not count in the budget of the call. It is
+    stopped when a call exceeds its budget, and started again on next call.
+    """
+
+    def __init__(self, initializer=None, memory: Optional[int] = None):
+        """Initializer."""
+        self.initializer = initializer
+        self.memory = memory
+        self._process = None
+        self._connection = None
+
+    def start(self) -> None:
+        """Start the child process and call `initializer`, if not running."""
+        if self._process is not None:
+            return
+        receiver, sender = CONTEXT.Pipe()
+        self._process = CONTEXT.Process(
+            target=_serve, args=(sender, self.initializer, self.memory), daemon=True
+        )
+        self._process.start()
+        sender.close()
+        self._connection = receiver
+        self._result()  # initialized
+
+    def stop(self) -> None:
+        """Stop the child process, if it is running."""
+        if self._process is None:
+            return
+        self._connection.close()
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._process = None
+        self._connection = None
+
+    def call(self, function, argument, timeout: Optional[float] = None):
+        """
+        Return `function(argument)`, called in the child process.
+
+        `BudgetExceeded` is raised when the call lasts more than `timeout`
+        seconds, or uses more memory than the budget of the worker.
+        `function`, `argument` and the result must be picklable.
+        """
+        self.start()
+        self._connection.send((function, argument))
+        if not self._connection.poll(timeout):
+            self.stop()
+            raise BudgetExceeded(f"time budget exceeded ({timeout:g} s)")
+        return self._result()
+
+    def _result(self):
+        """Return the result sent by the child process, stop it on failure."""
+        try:
+            status, value = self._connection.recv()
+        except EOFError:  # killed before sending its result
+            status, value = "killed", None
+        if status == "ok":
+            return value
+        process = self._process
+        self.stop()
+        if status == "memory" or (status == "killed" and self.memory):
+            megabytes = self.memory // 2**20
+            raise BudgetExceeded(f"memory budget exceeded ({megabytes} MiB)")
+        if status == "killed":
+            raise RuntimeError(f"process exited with code {process.exitcode}")
+        raise RuntimeError(value)
+
+
+class WorkerPool:
+    """Workers sharing the same budget, one per concurrent call."""
+
+    def __init__(self, initializer=None, memory: Optional[int] = None):
+        """Initializer."""
+        if memory and resource is None:
+            log.warning("Memory budgets are not supported on this platform")
+        self.initializer = initializer
+        self.memory = memory
+        self._idle: List[Worker] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def worker(self):
+        """Yield an idle worker, already started, for the calls of a thread."""
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is None:
+            worker = Worker(self.initializer, self.memory)
+        try:
+            worker.start()
+            yield worker
+        finally:
+            with self._lock:
+                self._idle.append(worker)
+
+    def call(self, function, argument, timeout: Optional[float] = None):
+        """Return `function(argument)`, called by an idle worker (see `Worker.call`)."""
+        with self.worker() as worker:
+            return worker.call(function, argument, timeout)
+
+    def close(self) -> None:
+        """Stop the workers."""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,35 @@
+"""Location of the local caches."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+def default_cache_directory() -> Path:
+    """Return the directory where padpo stores its caches."""
+    if os.environ.get("PADPO_CACHE_DIR"):
+        return Path(os.environ["PADPO_CACHE_DIR"])
+    if os.environ.get("XDG_CACHE_HOME"):
+        return Path(os.environ["XDG_CACHE_HOME"]) / "padpo"
+    return Path.home() / ".cache" / "padpo"
+
+
+def write_atomically(path, content: str) -> None:
+    """
+    Replace the content of a file, readers never see a partial file.
+
+    The mode of the replaced file is kept, and the temporary file is removed
+    when the write fails.
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8", newline="") as f:
+            f.write(content)
+        if path.exists():
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -6,11 +6,49 @@ from padpo.checkers.grammalecte import GrammalecteChecker
 from padpo.checkers.linelength import LineLengthChecker
 from padpo.checkers.nbsp import NonBreakableSpaceChecker
 
-checkers = [
-    EmptyChecker(),
-    FuzzyChecker(),
-    GrammalecteChecker(),
-    GlossaryChecker(),
-    LineLengthChecker(),
-    NonBreakableSpaceChecker(),
-]
+
+def create_checkers():
+    """Return new instances of all the checkers.
+
+    Checkers are configured once (see `Checker.configure`), then they can be
+    shared by threads checking different files.
+    """
+    return [
+        EmptyChecker(),
+        FuzzyChecker(),
+        GrammalecteChecker(),
+        GlossaryChecker(),
+        LineLengthChecker(),
+        NonBreakableSpaceChecker(),
+    ]
+
+
+# checkers used by the command line
+checkers = create_checkers()
+
+# checkers run only on files of a language (language code without region),
+# checkers in no profile are run on every file
+language_profiles = {
+    "fr": (GrammalecteChecker, GlossaryChecker, NonBreakableSpaceChecker),
+}
+
+
+def checkers_for_language(language: str, checkers=checkers):
+    """Return the checkers to run on a file, according to its language.
+
+    All checkers are run on files without language.
+    """
+    if not language:
+        return checkers
+    language = language.replace("-", "_").split("_")[0].lower()
+    profile = language_profiles.get(language, ())
+    specific_checkers = tuple(
+        checker_class
+        for checker_classes in language_profiles.values()
+        for checker_class in checker_classes
+    )
+    return [
+        checker
+        for checker in checkers
+        if isinstance(checker, profile) or not isinstance(checker, specific_checkers)
+    ]
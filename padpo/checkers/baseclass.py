@@ -1,6 +1,7 @@
 """Base class for checkers."""
 
 from abc import ABC, abstractmethod
+from collections import namedtuple
 
 import simplelogging
 
@@ -8,30 +9,60 @@ from padpo.pofile import PoFile, PoItem
 
 log = simplelogging.get_logger()
 
+# replacement of msgstr_full_content[start:end] of an item
+Edit = namedtuple("Edit", ["start", "end", "replacement"])
+
 
 class Checker(ABC):
     """Base class for checkers."""
 
     name = "UnknownChecker"  # name displayed in error messages
+    code = "unknown"  # stable identifier, used to ignore the checker
+    rules = ()  # stable identifiers of the messages of the checker
+    # True when check_item only needs the lines of the item (not its text),
+    # so that the checker can run while the file is parsed (--quick)
+    quick = False
 
     def check_file(self, pofile: PoFile):
         """Check a `*.po` file."""
         if not isinstance(pofile, PoFile):
             log.error("%s is not an instance of PoFile", str(pofile))
         for item in pofile.content:
-            self.check_item(item)
+            if not self.is_ignored(item):
+                self.check_item(item)
+
+    def is_ignored(self, item: PoItem) -> bool:
+        """Return True when all the rules of the checker are ignored for an item."""
+        if not item.ignored_rules:
+            return False
+        # checkers without rules are only ignored by their code
+        return self.code in item.ignored_rules or bool(
+            self.rules and item.ignored_rules.issuperset(self.rules)
+        )
 
     @abstractmethod
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file."""
         return NotImplementedError
 
+    def fix_item(self, item: PoItem):
+        """Return the edits fixing an item in a `*.po` file (list of `Edit`)."""
+        return []
+
+    def needs_rewrap(self, item: PoItem) -> bool:
+        """Return True when the msgstr lines of an item have to be wrapped again."""
+        return False
+
     def add_arguments(self, parser):
         """Let any checker register argparse arguments."""
 
     def configure(self, args):
         """Store the result of parse_args, to get back arguments from self.add_arguments."""
 
+    def fingerprint(self) -> str:
+        """Return a string identifying the configuration changing the results."""
+        return ""
+
 
 def replace_quotes(match):
     """Replace match with « xxxxxxx »."""
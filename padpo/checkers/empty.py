@@ -9,8 +9,13 @@ class EmptyChecker(Checker):
     """Checker for missing translations."""
 
     name = "Empty"
+    code = "empty"
+    rules = ("empty",)
+    quick = True
 
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file."""
         if item.msgid_full_content and not item.msgstr_full_content:
-            item.add_warning(self.name, "This entry is not translated yet.")
+            item.add_warning(
+                self.name, "This entry is not translated yet.", rule="empty"
+            )
@@ -8,8 +8,11 @@ class FuzzyChecker(Checker):
     """Checker for fuzzy translations."""
 
     name = "Fuzzy"
+    code = "fuzzy"
+    rules = ("fuzzy",)
+    quick = True
 
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file."""
         if item.fuzzy:
-            item.add_warning(self.name, "This entry is tagged as fuzzy.")
+            item.add_warning(self.name, "This entry is tagged as fuzzy.", rule="fuzzy")
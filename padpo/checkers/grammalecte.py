@@ -1,8 +1,17 @@
 """Checker for grammar errors."""
 
+import copy
+import functools
+import hashlib
+import importlib.metadata
+import json
 import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Set, Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 import requests
 import simplelogging
@@ -13,52 +22,422 @@ from pygrammalecte import (
     grammalecte_text,
 )
 
+from padpo.budget import BudgetExceeded, WorkerPool
 from padpo.checkers.baseclass import Checker, replace_quotes
-from padpo.checkers.glossary import glossary
+from padpo.checkers.glossary import (
+    DEFAULT_GLOSSARY,
+    glossary_paths,
+    load_glossary,
+)
 from padpo.pofile import PoFile, PoItem
 
 log = simplelogging.get_logger()
 
+# number of sentences whose Grammalecte results are kept in memory
+RESULT_CACHE_SIZE = 50_000
+# increment when the format of the sentence cache changes
+SENTENCE_CACHE_VERSION = 1
+# Grammalecte engine is not known to be thread-safe, calls are serialized
+GRAMMALECTE_LOCK = threading.Lock()
+# text left when reStructuredText markup and quotes have been replaced
+# (alternatives are exclusive, so that fullmatch does not backtrack)
+CODE_ONLY = re.compile(r"(?:«\sx*\s»|(?!«\sx*\s»)[\W\d_])*")
+# spaces between two sentences
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+# rule of the warning reporting that a file was not checked (budget exceeded)
+NOT_CHECKED = "grammalecte-not-checked"
+
+
+def grammalecte_messages(text: str) -> List[GrammalecteMessage]:
+    """Return the Grammalecte messages of a text (run in a child process)."""
+    return list(grammalecte_text(text))
+
+
+def load_grammalecte() -> None:
+    """Load Grammalecte in a worker process, before its first timed call."""
+    grammalecte_messages("Bonjour.")
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """Return the sentences of a text, and their offsets (without spaces around)."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append((start, text[start : match.start()]))
+        start = match.end()
+    sentences.append((start, text[start:]))
+    return [
+        (offset + len(sentence) - len(sentence.lstrip()), sentence.strip())
+        for offset, sentence in sentences
+        if sentence.strip()
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def sentence_key_prefix() -> bytes:
+    """Return the prefix of sentence keys (cache format and Grammalecte versions)."""
+    try:
+        version = importlib.metadata.version("pygrammalecte")
+    except importlib.metadata.PackageNotFoundError:
+        version = ""
+    return f"{SENTENCE_CACHE_VERSION}\0{version}\0".encode("utf8")
+
+
+def sentence_key(sentence: str) -> str:
+    """Return the key of a sentence in the sentence cache."""
+    return hashlib.blake2b(
+        sentence_key_prefix() + sentence.encode("utf8"), digest_size=16
+    ).hexdigest()
+
+
+def message_to_json(message: GrammalecteMessage) -> list:
+    """Return a JSON serializable form of a Grammalecte message."""
+    if isinstance(message, GrammalecteSpellingMessage):
+        return ["spelling", message.start, message.end, message.word]
+    return [
+        "grammar",
+        message.start,
+        message.end,
+        message.url,
+        message.color,
+        message.suggestions,
+        message.message,
+        message.rule,
+        message.type,
+    ]
+
+
+def message_from_json(data: list) -> GrammalecteMessage:
+    """Return a Grammalecte message (on the first line) from `message_to_json`."""
+    kind, start, end, *fields = data
+    if kind == "spelling":
+        return GrammalecteSpellingMessage(1, start, end, *fields)
+    return GrammalecteGrammarMessage(1, start, end, *fields)
+
+
+class SentenceCache:
+    """
+    Grammalecte messages (before filtering) of sentences, by sentence key.
+
+    Recently used sentences are kept in memory, and all the sentences are
+    stored in an SQLite database when a path is given.
+    """
+
+    def __init__(self, path=None, size: int = RESULT_CACHE_SIZE):
+        """Initializer."""
+        self.path = Path(path) if path else None
+        self.size = size
+        self._memory: OrderedDict = OrderedDict()
+        self._connection = None
+        # protects the memory cache and the connection, shared by threads
+        self._lock = threading.Lock()
+
+    def _database(self) -> Optional[sqlite3.Connection]:
+        """Return the connection to the database (opened on first use)."""
+        if self._connection is None and self.path:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS sentences "
+                    "(key TEXT PRIMARY KEY, messages TEXT NOT NULL)"
+                )
+                self._connection = connection
+            except (OSError, sqlite3.Error) as exc:
+                log.warning("Unable to open Grammalecte cache: %s", exc)
+                self.path = None
+        return self._connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[GrammalecteMessage]]:
+        """Return the stored messages of the sentences found in the cache."""
+        results = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                messages = self._memory.get(key)
+                if messages is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    results[key] = messages
+            database = self._database() if missing else None
+            if database is None:
+                return results
+            try:
+                for index in range(0, len(missing), 500):
+                    chunk = missing[index : index + 500]
+                    rows = database.execute(
+                        "SELECT key, messages FROM sentences WHERE key IN "
+                        f"({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    for key, messages in rows:
+                        results[key] = [
+                            message_from_json(data) for data in json.loads(messages)
+                        ]
+                        self._remember(key, results[key])
+            except (sqlite3.Error, ValueError) as exc:
+                log.warning("Unable to read Grammalecte cache: %s", exc)
+        return results
+
+    def update(self, results: Dict[str, List[GrammalecteMessage]]) -> None:
+        """Store the messages of sentences."""
+        with self._lock:
+            for key, messages in results.items():
+                self._remember(key, messages)
+            database = self._database()
+            if database is None:
+                return
+            try:
+                with database:
+                    database.executemany(
+                        "INSERT OR REPLACE INTO sentences VALUES (?, ?)",
+                        [
+                            (key, json.dumps([message_to_json(m) for m in messages]))
+                            for key, messages in results.items()
+                        ],
+                    )
+            except sqlite3.Error as exc:
+                log.warning("Unable to store Grammalecte cache: %s", exc)
+
+    def _remember(self, key: str, messages: List[GrammalecteMessage]) -> None:
+        self._memory[key] = messages
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+
+def grammalecte_cache_path(args) -> Optional[Path]:
+    """Return the path of the sentence cache database."""
+    if getattr(args, "no_cache", True) or not getattr(args, "cache_dir", None):
+        return None
+    return Path(args.cache_dir) / "grammalecte.sqlite"
+
 
 class GrammalecteChecker(Checker):
     """Checker for grammar errors."""
 
     name = "Grammalecte"
+    code = "grammalecte"
+    # NOT_CHECKED is a status, not a rule: ignoring the rules skips the check
+    rules = ("grammalecte-grammar", "grammalecte-spelling")
 
     def __init__(self):
         """Initialiser."""
         super().__init__()
-        self.personal_dict: Set[str] = set()
+        # configuration, replaced (never modified) by configure()
+        self.personal_dict: FrozenSet[str] = frozenset()
+        self.glossary_paths = (DEFAULT_GLOSSARY,)
+        self.cache = SentenceCache()
+        # budgets (None for no limit): seconds per file, seconds per run,
+        # bytes of memory per Grammalecte call
+        self.file_timeout: Optional[float] = None
+        self.run_timeout: Optional[float] = None
+        self.memory: Optional[int] = None
+        # processes running Grammalecte when there is a budget
+        self.workers: Optional[WorkerPool] = None
+        # reason => number of items not sent to Grammalecte
+        self.skipped: Counter = Counter()
+        # seconds spent in Grammalecte, in total and by file path
+        self.elapsed = 0.0
+        self.timings: Dict[str, float] = {}
+        # file path => why Grammalecte was stopped
+        self.overruns: Dict[str, str] = {}
+        # protects skipped and timings, shared by threads checking files
+        self._lock = threading.Lock()
 
     def check_file(self, pofile: PoFile):
-        """Check a `*.po` file."""
+        """
+        Check a `*.po` file.
+
+        Texts are split into sentences, only the sentences that are not in
+        the cache are sent to Grammalecte, and the messages of the sentences
+        are shifted back to the item texts. When a budget is exceeded, the
+        items with new sentences are not checked, and a warning says so.
+        """
         if not isinstance(pofile, PoFile):
             log.error("%s is not an instance of PoFile", str(pofile))
-        text = pofile.rst2txt()
-        text = re.sub(r"«\s(.*?)\s»", replace_quotes, text)
-        warnings = grammalecte_text(text)
-        self.manage_warnings(warnings, pofile)
+        skipped = Counter()
+        # (item, [(offset, key)]) of the items to check
+        checked = []
+        sentences = {}  # key => sentence
+        for item in pofile.content:
+            text = self.prepare_text(item)
+            reason = self.skip_reason(item, text)
+            if reason:
+                skipped[reason] += 1
+                continue
+            offsets = []
+            for offset, sentence in split_sentences(text):
+                key = sentence_key(sentence)
+                sentences[key] = sentence
+                offsets.append((offset, key))
+            checked.append((item, offsets))
+        results = self.cache.get_many(sentences)
+        missing = {}  # key => sentence, for sentences not in the cache
+        for item, offsets in checked:
+            new_sentence = False
+            for _, key in offsets:
+                if key not in results and key not in missing:
+                    missing[key] = sentences[key]
+                    new_sentence = True
+            if not new_sentence:
+                skipped["cached"] += 1
+        with self._lock:
+            self.skipped.update(skipped)
+        if missing:
+            keys = list(missing)
+            try:
+                # one sentence every two lines: Grammalecte line N is keys[N // 2]
+                warnings = self.run_grammalecte(
+                    "\n\n".join(missing.values()), pofile.path
+                )
+            except BudgetExceeded as exc:
+                unchecked = [
+                    item
+                    for item, offsets in checked
+                    if any(key not in results for _, key in offsets)
+                ]
+                unchecked[0].add_warning(
+                    self.name,
+                    "{} entries not checked by Grammalecte: {}",
+                    len(unchecked),
+                    exc.reason,
+                    rule=NOT_CHECKED,
+                )
+                checked = [
+                    (item, offsets)
+                    for item, offsets in checked
+                    if all(key in results for _, key in offsets)
+                ]
+            else:
+                new_results = {key: [] for key in keys}
+                for warning in warnings:
+                    stored_warning = copy.copy(warning)
+                    stored_warning.line = 1
+                    new_results[keys[warning.line // 2]].append(stored_warning)
+                self.cache.update(new_results)
+                results.update(new_results)
+        for item, offsets in checked:
+            item_warnings = []
+            for offset, key in offsets:
+                for warning in results[key]:
+                    item_warning = copy.copy(warning)
+                    item_warning.start += offset
+                    item_warning.end += offset
+                    item_warnings.append(item_warning)
+            self.manage_warnings(item_warnings, pofile, [item])
+
+    def run_grammalecte(self, text: str, path) -> List[GrammalecteMessage]:
+        """
+        Return the Grammalecte messages of a text, within the budgets.
+
+        Without budget, Grammalecte runs in this process. Otherwise it runs in
+        a worker process (started and loaded once, not counted in the
+        budgets), stopped when it exceeds the budgets: `BudgetExceeded` is
+        raised, and the overrun is recorded.
+        """
+        timeout = self.file_timeout
+        run_limited = False  # True when the run budget gives the timeout
+        if self.run_timeout is not None:
+            with self._lock:
+                remaining = self.run_timeout - self.elapsed
+            run_limited = timeout is None or remaining < timeout
+            timeout = remaining if run_limited else timeout
+        start = None  # once Grammalecte is loaded
+        try:
+            if timeout is not None and timeout <= 0:
+                raise BudgetExceeded("run time budget exhausted")
+            if timeout is None and self.memory is None:
+                with GRAMMALECTE_LOCK:
+                    start = time.perf_counter()
+                    return grammalecte_messages(text)
+            with self._lock:
+                if self.workers is None:
+                    self.workers = WorkerPool(load_grammalecte, self.memory)
+                workers = self.workers
+            with workers.worker() as worker:
+                start = time.perf_counter()
+                try:
+                    return worker.call(grammalecte_messages, text, timeout)
+                except BudgetExceeded as exc:
+                    if run_limited and exc.reason.startswith("time"):
+                        raise BudgetExceeded("run time budget exhausted") from exc
+                    raise
+        except BudgetExceeded as exc:
+            with self._lock:
+                self.overruns[str(path)] = exc.reason
+            raise
+        finally:
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.elapsed += elapsed
+                    self.timings[str(path)] = self.timings.get(str(path), 0.0) + elapsed
+
+    @staticmethod
+    def prepare_text(item: PoItem) -> str:
+        """Return the text of an item, as sent to Grammalecte."""
+        text = re.sub(r"«\s(.*?)\s»", replace_quotes, item.msgstr_rst2txt)
+        return text.replace("\n", " ")  # keep one line per item
+
+    def skip_reason(self, item: PoItem, text: str) -> Optional[str]:
+        """Return why an item does not need to be sent to Grammalecte, if so."""
+        if self.is_ignored(item):
+            return "ignored"
+        if not text.strip():
+            return "empty"
+        if CODE_ONLY.fullmatch(text):
+            return "code-only"
+        if item.msgstr_full_content == item.msgid_full_content:
+            return "copy"
+        return None
 
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file (does nothing)."""
         pass
 
-    def manage_warnings(self, warnings: GrammalecteMessage, pofile: PoFile) -> None:
-        """Manage warnings returned by grammalecte."""
+    def manage_warnings(
+        self,
+        warnings: List[GrammalecteMessage],
+        pofile: PoFile,
+        items: Optional[List[PoItem]] = None,
+    ) -> None:
+        """
+        Manage warnings returned by grammalecte.
+
+        `items` are the items sent to Grammalecte (all the items of the file
+        by default), the line of a warning being twice the index of its item.
+        """
+        if items is None:
+            items = pofile.content
         for warning in warnings:
             if self.filter_out_grammar_error(warning) or self.filter_out_spelling_error(
                 warning
             ):
                 continue
-            item_index = warning.line // 2
-            item = pofile.content[item_index]
+            item = items[warning.line // 2]
             start = max(0, warning.start - 40)
             end = warning.end + 10
+            if isinstance(warning, GrammalecteSpellingMessage):
+                rule = "grammalecte-spelling"
+            else:
+                rule = "grammalecte-grammar"
             item.add_warning(
                 self.name,
-                f"{warning.message} => " f"###{item.msgstr_rst2txt[start:end]}###",
+                self.render_message,
+                warning.message,
+                item,
+                start,
+                end,
+                rule=rule,
             )
 
+    @staticmethod
+    def render_message(message: str, item: PoItem, start: int, end: int) -> str:
+        """Return the text of a Grammalecte warning."""
+        return f"{message} => ###{item.msgstr_rst2txt[start:end]}###"
+
     def filter_out_grammar_error(self, warning: GrammalecteMessage) -> bool:
         """Return True when grammalecte error should be ignored."""
         if not isinstance(warning, GrammalecteGrammarMessage):
@@ -94,23 +473,32 @@ class GrammalecteChecker(Checker):
             return True  # white list
         if warning.word.endswith("aAaA"):  # internal links
             return True
-        if warning.word.lower() in glossary:
+        glossary = load_glossary(self.glossary_paths)
+        if warning.word.lower() in glossary.lowercase_terms:
             return True
         if warning.word.lower() == "uplet":  # partially italic word in glossary
             return True
         return False
 
-    def _get_personal_dict(self, dict_path: str) -> None:
+    @staticmethod
+    def _get_personal_dict(dict_path: str) -> Set[str]:
+        """Return the words of a personal dict file or URL."""
         if "://" in dict_path:
             download_request = requests.get(dict_path)
             download_request.raise_for_status()
             lines = download_request.text
         else:
             lines = Path(dict_path).read_text(encoding="UTF-8")
+        words = set()
         for line in lines.splitlines():
             word = line.strip()
-            self.personal_dict.add(word)
-            self.personal_dict.add(word.title())
+            words.add(word)
+            words.add(word.title())
+        return words
+
+    def fingerprint(self) -> str:
+        """Return a string identifying the configuration changing the results."""
+        return "\n".join(sorted(self.personal_dict))
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -119,9 +507,37 @@ class GrammalecteChecker(Checker):
             dest="dicts",
             help="Personal dict files or URLs. Should contain onw word per line.",
         )
+        parser.add_argument(
+            "--grammalecte-timeout",
+            metavar="SECONDS",
+            type=float,
+            help="stop Grammalecte on a file after SECONDS (file not checked)",
+        )
+        parser.add_argument(
+            "--grammalecte-run-timeout",
+            metavar="SECONDS",
+            type=float,
+            help="stop running Grammalecte after SECONDS in total (files not checked)",
+        )
+        parser.add_argument(
+            "--grammalecte-memory",
+            metavar="MIB",
+            type=int,
+            help="stop Grammalecte on a file using more than MIB of memory (Unix)",
+        )
 
     def configure(self, args):
         """Store the result of parse_args, to get back arguments from self.add_arguments."""
-        if args.dicts:
-            for dict_path in args.dicts:
-                self._get_personal_dict(dict_path)
+        words = set()
+        for dict_path in getattr(args, "dicts", None) or ():
+            words |= self._get_personal_dict(dict_path)
+        self.personal_dict = frozenset(words)
+        self.glossary_paths = glossary_paths(args)
+        self.cache = SentenceCache(grammalecte_cache_path(args))
+        self.file_timeout = getattr(args, "grammalecte_timeout", None)
+        self.run_timeout = getattr(args, "grammalecte_run_timeout", None)
+        memory = getattr(args, "grammalecte_memory", None)
+        self.memory = memory * 2**20 if memory else None
+        if self.workers is not None:
+            self.workers.close()
+            self.workers = None
@@ -10,6 +10,9 @@ class LineLengthChecker(Checker):
     """Checker for line length."""
 
     name = "Line length"
+    code = "line-length"
+    rules = ("line-length",)
+    quick = True
 
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file."""
@@ -17,6 +20,13 @@ class LineLengthChecker(Checker):
             if len(line) > MAX_LINE_LENGTH - 2:  # 2 is for ""
                 item.add_error(
                     self.name,
-                    f"Line too long ({len(line) + 2} > "
-                    f"{MAX_LINE_LENGTH}): {line}",
+                    "Line too long ({} > {}): {}",
+                    len(line) + 2,
+                    MAX_LINE_LENGTH,
+                    line,
+                    rule="line-length",
                 )
+
+    def needs_rewrap(self, item: PoItem) -> bool:
+        """Return True when the msgstr lines of an item have to be wrapped again."""
+        return any(len(line) > MAX_LINE_LENGTH - 2 for line in item.msgstr)
@@ -2,22 +2,26 @@
 
 import re
 
-from padpo.checkers.baseclass import Checker, replace_quotes
+from padpo.checkers.baseclass import Checker, Edit, replace_quotes
 from padpo.pofile import PoItem
 
+NBSP = "\u00a0"
+
 
 class NonBreakableSpaceChecker(Checker):
     """Checker for missing non breakable spaces."""
 
     name = "NBSP"
+    code = "nbsp"
+    rules = ("nbsp-quotes", "nbsp-punctuation")
 
     def check_item(self, item: PoItem):
         """Check an item in a `*.po` file."""
         text = item.msgstr_rst2txt
         for match in re.finditer(r"(.{0,30})(«[^ ])(.{0,30})", text):
-            self.__add_message(item, *match.groups())
+            self.__add_message(item, match)
         for match in re.finditer(r"(.{0,30})([^ ][»])(.{0,30})", text):
-            self.__add_message(item, *match.groups())
+            self.__add_message(item, match)
         text = re.sub(r"«\s(.*?)\s»", replace_quotes, text)
         text = re.sub(r"http://", "http-//", text)
         text = re.sub(r"https://", "https-//", text)
@@ -25,22 +29,96 @@ class NonBreakableSpaceChecker(Checker):
             regex = r"(.{0,30})([^ ][" + sign + r"])(.{0,30})"
             for match in re.finditer(regex, text):
                 prefix = item.msgstr_rst2txt[match.start(1) : match.end(1)]
-                suffix = item.msgstr_rst2txt[match.start(3) : match.end(3)]
-                match = item.msgstr_rst2txt[match.start(2) : match.end(2)]
-                if prefix[-1] not in ":?!.":
-                    self.__add_message_space_before(item, prefix, match, suffix)
+                if not prefix or prefix[-1] not in ":?!.":
+                    self.__add_message_space_before(item, match)
 
-    def __add_message(self, item, prefix, match, suffix):
+    def __add_message(self, item, match):
         item.add_error(
             self.name,
-            "Space should be replaced with a non-breakable space in "
-            f'"{match}": between ###{prefix}### and ###{suffix}###',
+            self.render_space,
+            item,
+            match.start(1),
+            match.start(2),
+            match.start(3),
+            match.end(3),
+            rule="nbsp-quotes",
         )
 
-    def __add_message_space_before(self, item, prefix, match, suffix):
+    def __add_message_space_before(self, item, match):
         item.add_error(
             self.name,
+            self.render_space_before,
+            item,
+            match.start(1),
+            match.start(2),
+            match.start(3),
+            match.end(3),
+            rule="nbsp-punctuation",
+        )
+
+    @staticmethod
+    def render_space(item, prefix_start, match_start, suffix_start, suffix_end):
+        """Return the text of a message about a space to replace."""
+        text = item.msgstr_rst2txt
+        prefix = text[prefix_start:match_start]
+        match = text[match_start:suffix_start]
+        suffix = text[suffix_start:suffix_end]
+        return (
+            "Space should be replaced with a non-breakable space in "
+            f'"{match}": between ###{prefix}### and ###{suffix}###'
+        )
+
+    @staticmethod
+    def render_space_before(item, prefix_start, match_start, suffix_start, suffix_end):
+        """Return the text of a message about a missing space."""
+        text = item.msgstr_rst2txt
+        prefix = text[prefix_start:match_start]
+        match = text[match_start:suffix_start]
+        suffix = text[suffix_start:suffix_end]
+        return (
             f"There should be a non-breakable space before "
             f'"{match[1:]}": between ###{prefix}{match[0]}### and '
-            f"###{match[1:]}{suffix}###",
+            f"###{match[1:]}{suffix}###"
         )
+
+    def fix_item(self, item: PoItem):
+        """Return the edits adding missing non-breakable spaces."""
+        text = item.msgstr_full_content
+        masked = mask_markup(text)
+        edits = []
+        if "nbsp-quotes" not in item.ignored_rules:
+            for match in re.finditer(r"«(?=.)", masked):
+                edits.append(self.__space_edit(text, match.end(), after=True))
+            for match in re.finditer(r"(?<=.)»", masked):
+                edits.append(self.__space_edit(text, match.start()))
+        if "nbsp-punctuation" not in item.ignored_rules:
+            # only punctuation followed by a space or ending the text is fixed,
+            # to leave "::", URLs, hours, etc. untouched
+            regex = r"(?<=[^?!:;])[?!:;](?=$| |\\n)"
+            for match in re.finditer(regex, masked):
+                edits.append(self.__space_edit(text, match.start()))
+        return [edit for edit in edits if edit]
+
+    @staticmethod
+    def __space_edit(text, position, after=False):
+        """Return the edit putting a non-breakable space before (or after) a sign."""
+        space_position = position if after else position - 1
+        space = text[space_position]
+        if space == NBSP:
+            return None
+        if space == " ":
+            return Edit(space_position, space_position + 1, NBSP)
+        return Edit(position, position, NBSP)
+
+
+def mask_markup(text: str) -> str:
+    """Replace reStructuredText markup with x, keeping the offsets."""
+
+    def mask(match):
+        return "x" * len(match.group(0))
+
+    text = re.sub(r"``.*?``", mask, text)
+    text = re.sub(r":[a-zA-Z:]+:`.+?`", mask, text)
+    text = re.sub(r"`[^`]*`_*", mask, text)
+    text = re.sub(r"(?:http|https|ftp)://\S+", mask, text)
+    return text
@@ -0,0 +1,128 @@
+"""Automatic fixes of `*.po` files."""
+
+import re
+from pathlib import Path
+from typing import List
+
+import simplelogging
+
+from padpo.cache import write_atomically
+from padpo.checkers import checkers_for_language
+from padpo.checkers.linelength import MAX_LINE_LENGTH
+from padpo.pofile import PoFile, PoItem
+
+log = simplelogging.get_logger()
+
+
+def apply_edits(text: str, edits) -> str:
+    """Apply edits (replacements of text[start:end]) to a text."""
+    result = []
+    position = 0
+    for start, end, replacement in sorted(set(edits)):
+        if start < position:
+            continue  # overlapping edit
+        result.append(text[position:start])
+        result.append(replacement)
+        position = end
+    result.append(text[position:])
+    return "".join(result)
+
+
+def wrap(keyword: str, content: str, width: int = MAX_LINE_LENGTH) -> List[str]:
+    """
+    Return the lines of a `keyword "content"` entry, wrapped like msgcat does.
+
+    The content is kept on the keyword line when it fits, otherwise it starts
+    on the next line, and lines are broken after spaces and after `\\n`.
+    """
+    if len(keyword) + len(content) + 3 <= width and "\\n" not in content[:-2]:
+        return [f'{keyword} "{content}"\n']
+    lines = [f'{keyword} ""\n']
+    for segment in re.findall(r".*?\\n|.+$", content):
+        while len(segment) > width - 2:
+            cut = segment.rfind(" ", 0, width - 2) + 1
+            if not cut:
+                cut = segment.find(" ", width - 2) + 1
+                if not cut:
+                    break  # a single word longer than a line
+            lines.append(f'"{segment[:cut]}"\n')
+            segment = segment[cut:]
+        if segment:
+            lines.append(f'"{segment}"\n')
+    return lines
+
+
+def fix_item(item: PoItem, checkers) -> List[str]:
+    """Return the fixed msgstr lines of an item, or an empty list."""
+    edits = []
+    rewrap = False
+    for checker in checkers:
+        if checker.is_ignored(item):
+            continue
+        edits.extend(checker.fix_item(item))
+        rewrap = rewrap or checker.needs_rewrap(item)
+    if not edits and not rewrap:
+        return []
+    return wrap("msgstr", apply_edits(item.msgstr_full_content, edits))
+
+
+def line_ending(line: str) -> str:
+    """Return the line ending of a line read without newline translation."""
+    return line[len(line.rstrip("\r\n")) :]
+
+
+def fix_file(path, checkers, suppressions=None) -> int:
+    """
+    Fix a `*.po` file in place, return the number of fixed items.
+
+    The raw lines are kept for splicing, so that the fixed lines are written
+    with the line endings of the file (items are parsed from "\\n" lines).
+    """
+    path = Path(path)
+    with open(path, encoding="utf8", newline="") as f:
+        lines = f.readlines()
+    pofile = PoFile()
+    pofile.path = path
+    pofile.parse_lines(
+        line.rstrip("\r\n") + "\n" if line_ending(line) else line for line in lines
+    )
+    if suppressions:
+        suppressions.apply(pofile)
+    checkers = checkers_for_language(pofile.language, checkers)
+    nb_fixed_items = 0
+    for item in reversed(pofile.content):
+        if item.msgstr_lineno is None:
+            continue  # no msgstr, or plural forms
+        new_lines = fix_item(item, checkers)
+        start = item.msgstr_lineno - 1
+        end = start + 1
+        while end < len(lines) and lines[end].startswith('"'):
+            end += 1
+        ending = line_ending(lines[start]) or "\n"
+        new_lines = [line[:-1] + ending for line in new_lines]
+        if new_lines and new_lines != lines[start:end]:
+            lines[start:end] = new_lines
+            nb_fixed_items += 1
+            log.info(
+                "Entry fixed.",
+                extra={
+                    "pofile": path,
+                    "poline": item.lineno_start,
+                    "checker": "Fix",
+                    "leveldesc": "info",
+                },
+            )
+    if nb_fixed_items:
+        write_atomically(path, "".join(lines))
+    return nb_fixed_items
+
+
+def fix_paths(paths, checkers, suppressions=None) -> int:
+    """Fix `*.po` files (or directories) in place, return the number of fixed items."""
+    nb_fixed_items = 0
+    for path in paths:
+        path = Path(path)
+        filepaths = path.rglob("*.po") if path.is_dir() else [path]
+        for filepath in filepaths:
+            nb_fixed_items += fix_file(filepath, checkers, suppressions)
+    return nb_fixed_items
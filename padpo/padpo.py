@@ -1,65 +1,401 @@
 """Entry point of padpo."""
 
 import argparse
+import asyncio
+import collections
+import copy
+import functools
 import importlib
+import io
+import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import simplelogging
 
 from padpo.pofile import PoFile
-from padpo.checkers import checkers
-from padpo.github import pull_request_files
+from padpo.cache import default_cache_directory
+from padpo.checkers import checkers, checkers_for_language
+from padpo.fix import fix_paths
+from padpo.github import download_file, pull_request_file_list
+from padpo.shard import (
+    ItemCountIndex,
+    ShardResults,
+    missing_shards,
+    parse_shard,
+    select_shard,
+)
+from padpo.snapshot import SnapshotStore
+from padpo.stats import MessageCounts, Statistics
+from padpo.suppressions import SuppressionIndex
 
+# path of the standard input in input paths
+STDIN = "-"
 
-log = None
 
+class DefaultLogFields(logging.Filter):
+    """Give default values to the fields of the console format."""
 
-def check_file(path, pull_request_info=None):
+    def filter(self, record):
+        """Add missing fields to a log record."""
+        for field, default in (("pofile", "padpo"), ("poline", ""), ("checker", "")):
+            if not hasattr(record, field):
+                setattr(record, field, default)
+        if not hasattr(record, "leveldesc"):
+            record.leveldesc = record.levelname.lower()
+        return True
+
+
+def check_pofile(pofile: PoFile, checkers=checkers) -> PoFile:
+    """
+    Run the checkers of the language of a `*.po` file on it.
+
+    When the file has a diff, only the items changed by the diff are checked.
+    """
+    checked_pofile = pofile
+    if pofile.diff is not None:
+        pofile.tag_in_pull_request()
+        checked_pofile = copy.copy(pofile)
+        checked_pofile.content = [
+            item for item in pofile.content if item.inside_pull_request
+        ]
+    for checker in checkers_for_language(pofile.language, checkers):
+        checker.check_file(checked_pofile)
+    return pofile
+
+
+def parse_and_check(path, suppressions=None, checkers=checkers) -> PoFile:
+    """Parse and check a `*.po` file (`-` for stdin), return the checked `PoFile`."""
+    if str(path) == STDIN:
+        pofile = PoFile.from_bytes(sys.stdin.buffer.read(), "<stdin>")
+    else:
+        pofile = PoFile(path)
+    if suppressions:
+        suppressions.apply(pofile)
+    return check_pofile(pofile, checkers)
+
+
+def parse_and_quick_check(path, suppressions=None, checkers=checkers) -> PoFile:
+    """
+    Parse a `*.po` file, running quick checkers on each item as it is parsed.
+
+    Other checkers are not run, and only the items with messages are kept.
+    """
+    pofile = PoFile()
+    pofile.path = "<stdin>" if str(path) == STDIN else path
+    selected_checkers = None
+    rules_by_line = suppressions.rules_by_line(pofile.path) if suppressions else []
+
+    def check_item(item):
+        nonlocal selected_checkers
+        if selected_checkers is None:  # headers are parsed before the 1st item
+            selected_checkers = [
+                checker
+                for checker in checkers_for_language(pofile.language, checkers)
+                if checker.quick
+            ]
+        if rules_by_line:
+            SuppressionIndex.apply_item(rules_by_line, item)
+        for checker in selected_checkers:
+            if not checker.is_ignored(item):
+                checker.check_item(item)
+        return bool(item.warnings)
+
+    if str(path) == STDIN:
+        pofile.parse_lines(
+            io.TextIOWrapper(sys.stdin.buffer, encoding="utf8"), check_item
+        )
+    else:
+        with open(path, encoding="utf8") as f:
+            pofile.parse_lines(f, check_item)
+    return pofile
+
+
+def check_file(path, statistics=None, suppressions=None):
     """Check a `*.po` file."""
-    pofile = PoFile(path)
+    pofile = parse_and_check(path, suppressions)
+    return report(pofile, statistics)
 
-    for checker in checkers:
-        checker.check_file(pofile)
 
-    return pofile.display_warnings(pull_request_info)
+def report(pofile, statistics=None, output=None, display=True):
+    """
+    Log messages of a checked file, or count them in statistics.
 
+    Messages are also recorded in `output` (`ShardResults`), if any. They
+    are not logged when `display` is False.
+    """
+    if output is not None:
+        output.add_file(pofile)
+    if statistics is None and display:
+        return pofile.display_warnings()
+    if statistics is not None:
+        statistics.add_file(pofile)
+    return pofile.errors_and_warnings()
 
-def check_directory(path, pull_request_info=None):
-    """Check a directory containing `*.po` files."""
-    path = Path(path)
+
+def bounded_map(pool, function, iterable, window: int):
+    """Like `pool.map`, with at most `window` calls submitted but not consumed."""
+    pending = collections.deque()
+    for argument in iterable:
+        pending.append(pool.submit(function, argument))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def check_content(content: bytes, path, diff=None, suppressions=None):
+    """Check the content of a `*.po` file, return the checked `PoFile`."""
+    pofile = PoFile.from_bytes(content, path)
+    pofile.diff = diff
+    if suppressions:
+        suppressions.apply(pofile)
+    return check_pofile(pofile)
+
+
+def check_files(
+    filepaths,
+    statistics=None,
+    suppressions=None,
+    jobs=1,
+    output=None,
+    quick=False,
+    max_errors=0,
+    counts=None,
+    display=True,
+):
+    """Check `*.po` files.
+
+    With several jobs, files are checked concurrently by threads, and their
+    messages are still reported in order, by the calling thread. In quick
+    mode, only quick checkers are run (see `parse_and_quick_check`).
+
+    Once `max_errors` errors are found (if not 0), the remaining files are
+    not checked. When `counts` (`MessageCounts`) is given, messages are only
+    counted there, and empty lists are returned.
+    """
     result_errors = []
     result_warnings = []
-    for filepath in path.rglob("*.po"):
-        errors, warnings = check_file(filepath, pull_request_info)
-        result_errors.extend(errors)
-        result_warnings.extend(warnings)
+    nb_errors = 0
+    check = functools.partial(
+        parse_and_quick_check if quick else parse_and_check, suppressions=suppressions
+    )
+    pool = ThreadPoolExecutor(jobs) if jobs > 1 else None
+    try:
+        if pool:
+            # files are checked (at most) a few steps ahead of the reports
+            pofiles = bounded_map(pool, check, filepaths, 2 * jobs)
+        else:
+            pofiles = map(check, filepaths)
+        for pofile in pofiles:
+            errors, warnings = report(pofile, statistics, output, display)
+            nb_errors += len(errors)
+            if counts is None:
+                result_errors.extend(errors)
+                result_warnings.extend(warnings)
+            else:
+                counts.add(errors, warnings)
+            if max_errors and nb_errors >= max_errors:
+                if counts is not None:
+                    counts.stopped = True
+                break
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
     return result_errors, result_warnings
 
 
-def check_path(path, pull_request_info=None):
+def check_directory(path, statistics=None, suppressions=None, jobs=1):
+    """Check a directory containing `*.po` files."""
+    return check_files(Path(path).rglob("*.po"), statistics, suppressions, jobs)
+
+
+def check_path(path, statistics=None, suppressions=None, jobs=1):
     """Check a path (`*.po` file or directory)."""
     path = Path(path)
     if path.is_dir():
-        return check_directory(path, pull_request_info)
+        return check_directory(path, statistics, suppressions, jobs)
     else:
-        return check_file(path, pull_request_info)
+        return check_file(path, statistics, suppressions)
+
+
+def check_paths(
+    paths,
+    statistics=None,
+    suppressions=None,
+    jobs=1,
+    output=None,
+    quick=False,
+    max_errors=0,
+    counts=None,
+    display=True,
+):
+    """Check a list of paths (`*.po` file or directory), see `check_files`."""
+    return check_files(
+        po_file_paths(paths),
+        statistics,
+        suppressions,
+        jobs,
+        output,
+        quick,
+        max_errors,
+        counts,
+        display,
+    )
+
+
+def po_file_paths(paths):
+    """Return the paths of `*.po` files, directories being searched recursively."""
+    filepaths = []
+    for path in paths:
+        path = Path(path)
+        if str(path) != STDIN and path.is_dir():
+            filepaths.extend(path.rglob("*.po"))
+        else:
+            filepaths.append(path)
+    return filepaths
 
 
-def check_paths(paths, pull_request_info=None):
-    """Check a list of paths (`*.po` file or directory)."""
+async def check_pull_request_file(
+    fileinfo,
+    download_pool,
+    check_pool,
+    snapshot_store=None,
+    statistics=None,
+    suppressions=None,
+):
+    """Check a file of a pull request, as soon as it is downloaded."""
+    loop = asyncio.get_running_loop()
+    filename = fileinfo["filename"]
+    diff = fileinfo["patch"]
+    sha = fileinfo.get("sha", "")
+    pofile = None
+    if snapshot_store and sha:
+        pofile = snapshot_store.load(sha, filename, diff)
+    if pofile is None:
+        content = await loop.run_in_executor(download_pool, download_file, fileinfo)
+        pofile = await loop.run_in_executor(
+            check_pool, check_content, content, filename, diff, suppressions
+        )
+        if snapshot_store and sha:
+            snapshot_store.save(sha, pofile)
+    pofile.diff = diff
+    return report(pofile, statistics=statistics)
+
+
+async def check_pull_request(
+    pull_request: str,
+    snapshot_store=None,
+    statistics=None,
+    suppressions=None,
+    downloads=8,
+    jobs=1,
+):
+    """Check the `*.po` files of a pull request.
+
+    Files are downloaded concurrently, and each file is checked as soon as
+    its download completes, in `jobs` worker threads.
+    """
+    loop = asyncio.get_running_loop()
+    fileinfos = await loop.run_in_executor(None, pull_request_file_list, pull_request)
+    # without a patch (too big), the diff is unknown and nothing is reported
+    fileinfos = [
+        fileinfo
+        for fileinfo in fileinfos
+        if fileinfo["filename"].endswith(".po") and "patch" in fileinfo
+    ]
     result_errors = []
     result_warnings = []
-    for path in paths:
-        errors, warnings = check_path(path, pull_request_info)
-        result_errors.extend(errors)
-        result_warnings.extend(warnings)
+    download_pool = ThreadPoolExecutor(downloads)
+    check_pool = ThreadPoolExecutor(jobs)
+    try:
+        tasks = [
+            check_pull_request_file(
+                fileinfo,
+                download_pool,
+                check_pool,
+                snapshot_store,
+                statistics,
+                suppressions,
+            )
+            for fileinfo in fileinfos
+        ]
+        for errors, warnings in await asyncio.gather(*tasks):
+            result_errors.extend(errors)
+            result_warnings.extend(warnings)
+    finally:
+        download_pool.shutdown()
+        check_pool.shutdown()
     return result_errors, result_warnings
 
 
+def configure_logging(args):
+    """Configure the console output according to -c and -v options."""
+    if args.color:
+        console_format = (
+            "%(log_color)s[%(levelname)-8s]%(reset)s "
+            "%(green)s%(pofile)s:%(poline)s: "
+            "%(cyan)s[%(checker)s] %(message)s%(reset)s"
+        )
+    else:
+        console_format = "%(pofile)s:%(poline)s: %(leveldesc)s: %(message)s"
+    log = simplelogging.get_logger("__main__", console_format=console_format)
+    for handler in log.handlers:
+        handler.addFilter(DefaultLogFields())
+
+    if args.verbose < 1:
+        log.reduced_logging()
+    elif args.verbose < 2:
+        log.normal_logging()
+    else:
+        log.full_logging()
+    return log
+
+
+def merge(argv):
+    """Entry point of `padpo merge`: display results of shards."""
+    parser = argparse.ArgumentParser(
+        prog="padpo merge", description="Merge results of padpo --shard runs."
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    parser.add_argument("-c", "--color", action="store_true", help="color output")
+    parser.add_argument(
+        "results", metavar="PATH", nargs="+", help="results of padpo --json-output"
+    )
+    args = parser.parse_args(argv)
+    log = configure_logging(args)
+
+    shard_results = [ShardResults.read(path) for path in args.results]
+    messages = [message for result in shard_results for message in result.messages]
+    # same order as a single run over sorted files
+    messages.sort(key=lambda message: (message["path"], message["line"]))
+    errors = False
+    for message in messages:
+        is_error = message["level"] == "error"
+        errors = errors or is_error
+        (log.error if is_error else log.warning)(
+            "%s",
+            message["text"],
+            extra={
+                "pofile": message["path"],
+                "poline": message["line"],
+                "checker": message["checker"],
+                "leveldesc": message["level"],
+            },
+        )
+    missing = missing_shards(shard_results)
+    if missing:
+        log.error("missing results of shards %s", ", ".join(missing))
+    if errors or missing:
+        sys.exit(1)
+
+
 def main():
     """Entry point."""
-    global log
+    if sys.argv[1:2] == ["merge"]:
+        merge(sys.argv[2:])
+        return
 
     parser = argparse.ArgumentParser(description="Linter for *.po files.")
     parser.add_argument("-v", "--verbose", action="count", default=0)
@@ -69,7 +405,7 @@ def main():
         "--input-path",
         metavar="PATH",
         type=str,
-        help="path of the file or directory to check",
+        help="path of the file or directory to check (- for stdin)",
         default=[],
         # allow the user to provide no path at all,
         # this helps writing scripts
@@ -93,6 +429,81 @@ def main():
     )
     files.add_argument("--version", action="store_true", help="Return version")
     parser.add_argument("-c", "--color", action="store_true", help="color output")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        help="number of files checked concurrently",
+        default=1,
+    )
+    parser.add_argument(
+        "--max-errors",
+        metavar="N",
+        type=int,
+        help="stop checking files once N errors are found",
+        default=0,
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_const",
+        dest="max_errors",
+        const=1,
+        help="stop checking files at the first error (--max-errors 1)",
+    )
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        help="only display the numbers of errors and warnings",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="K/N",
+        type=parse_shard,
+        help="check only the K-th of N balanced parts of the input files",
+    )
+    parser.add_argument(
+        "--json-output",
+        metavar="PATH",
+        type=str,
+        help="also write the messages in JSON, for padpo merge",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=["table", "json"],
+        nargs="?",
+        const="table",
+        help="display statistics instead of messages",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="only run the checkers of empty, fuzzy entries and line length, "
+        "while parsing files",
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="fix the files in place when possible, before checking them",
+    )
+    parser.add_argument(
+        "--suppressions",
+        metavar="PATH",
+        type=str,
+        nargs="*",
+        help="files listing rules to ignore per file or per entry",
+        default=[],
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="PATH",
+        type=str,
+        help="directory of the local caches",
+        default=str(default_cache_directory()),
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="do not use the local caches"
+    )
 
     for checker in checkers:
         checker.add_arguments(parser)
@@ -103,38 +514,84 @@ def main():
         print(importlib.metadata.version("padpo"))
         sys.exit(0)
 
-    if args.color:
-        console_format = (
-            "%(log_color)s[%(levelname)-8s]%(reset)s "
-            "%(green)s%(pofile)s:%(poline)s: "
-            "%(cyan)s[%(checker)s] %(message)s%(reset)s"
-        )
-    else:
-        console_format = "%(pofile)s:%(poline)s: %(leveldesc)s: %(message)s"
-    log = simplelogging.get_logger("__main__", console_format=console_format)
+    if args.fix and (args.github or args.python_docs_fr):
+        parser.error("--fix can only be used with --input-path")
+    if args.fix and STDIN in args.input_path:
+        parser.error("--fix cannot be used with the standard input")
+    if args.quick and (args.github or args.python_docs_fr):
+        parser.error("--quick can only be used with --input-path")
+    if (args.max_errors or args.count) and (args.github or args.python_docs_fr):
+        parser.error("--max-errors and --count can only be used with --input-path")
+    if args.quick and args.stats:
+        parser.error("--quick cannot be used with --stats")
+    if (args.shard or args.json_output) and (args.github or args.python_docs_fr):
+        parser.error("--shard and --json-output can only be used with --input-path")
+    if args.shard and STDIN in args.input_path:
+        parser.error("--shard cannot be used with the standard input")
 
-    if args.verbose < 1:
-        log.reduced_logging()
-    elif args.verbose < 2:
-        log.normal_logging()
-    else:
-        log.full_logging()
+    configure_logging(args)
 
+    for checker in checkers:
+        checker.configure(args)
+
+    statistics = Statistics() if args.stats else None
+    # messages are counted, not kept, as only their numbers are used below
+    counts = MessageCounts()
+    output = None
+    if args.json_output:
+        output = ShardResults("{}/{}".format(*args.shard) if args.shard else "")
+    suppressions = SuppressionIndex()
+    for suppression_path in args.suppressions:
+        suppressions.load(suppression_path)
     if args.github or args.python_docs_fr:
         pull_request = ""
         if args.github:
             pull_request = args.github
         if args.python_docs_fr:
             pull_request = f"python/python-docs-fr/pull/{args.python_docs_fr}"
-        pull_request_info = pull_request_files(pull_request)
-        path = [pull_request_info.download_directory]
+        snapshot_store = None
+        if not args.no_cache:
+            snapshot_store = SnapshotStore(
+                Path(args.cache_dir) / "snapshots", checkers, suppressions
+            )
+        errors, warnings = asyncio.run(
+            check_pull_request(
+                pull_request, snapshot_store, statistics, suppressions, jobs=args.jobs
+            )
+        )
     else:
-        path = args.input_path
-        pull_request_info = None
+        input_paths = args.input_path
+        if args.shard:
+            index = ItemCountIndex(
+                None if args.no_cache else Path(args.cache_dir) / "item_counts.json"
+            )
+            input_paths = select_shard(po_file_paths(input_paths), *args.shard, index)
+            index.save()
+        if args.fix:
+            fix_paths(input_paths, checkers, suppressions)
+        errors, warnings = check_paths(
+            input_paths,
+            statistics=statistics,
+            suppressions=suppressions,
+            jobs=args.jobs,
+            output=output,
+            quick=args.quick,
+            max_errors=args.max_errors,
+            counts=counts,
+            display=not args.count,
+        )
 
-    for checker in checkers:
-        checker.configure(args)
+    if output is not None:
+        output.write(args.json_output)
 
-    errors, warnings = check_paths(path, pull_request_info=pull_request_info)
-    if errors:
+    if statistics is not None:
+        for checker in checkers:
+            statistics.add_timings(checker)
+    if args.stats == "json":
+        print(statistics.to_json())
+    elif args.stats:
+        print(statistics.to_table())
+    if args.count:
+        print(counts)
+    if errors or counts.errors:
         sys.exit(1)
@@ -1,12 +1,19 @@
 """Managment of `*.po` files."""
 
+import bisect
+import io
 import re
-from typing import List
+from typing import Dict, List
 
 import simplelogging
 
 log = simplelogging.get_logger()
 
+# header of a hunk in a unified diff (line counts are omitted when 1)
+HUNK_HEADER = re.compile(r"@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+# comment ignoring rules (or whole checkers) for an item
+IGNORE_COMMENT = re.compile(r"#\.\s*padpo:\s*ignore=([\w,-]+)")
+
 
 class PoItem:
     """Translation item."""
@@ -19,9 +26,12 @@ class PoItem:
         self.parsing_msgid = None
         self.msgid = []
         self.msgstr = []
+        # line of the `msgstr` keyword (None for plural forms)
+        self.msgstr_lineno = None
         self.fuzzy = False
         self.warnings = []
         self.inside_pull_request = False
+        self.ignored_rules = frozenset()
 
     def append_line(self, line):
         """Append a line of a `*.po` file to the item."""
@@ -32,6 +42,10 @@ class PoItem:
         elif line.startswith("msgstr"):
             self.parsing_msgid = False
             self.msgstr.append(line[8:-2])
+            if line.startswith('msgstr "') and not self.msgstr[:-1]:
+                self.msgstr_lineno = self.lineno_end
+            else:
+                self.msgstr_lineno = None
         elif line.startswith("#, fuzzy"):
             self.fuzzy = True
         elif line.startswith('"'):
@@ -91,13 +105,27 @@ class PoItem:
         text = re.sub(r"(\w)_\b", r"\1aAaA", text)  # internal links
         return text
 
-    def add_warning(self, checker_name: str, text: str) -> None:
-        """Add a checker warning to the item."""
-        self.warnings.append(Warning(checker_name, text))
+    def add_warning(self, checker_name: str, text, *args, rule: str = "") -> None:
+        """
+        Add a checker warning to the item.
+
+        `text` is either the text of the warning, a format string or a
+        function, rendered with `args` when the warning is displayed.
+        """
+        if rule in self.ignored_rules:
+            return
+        self.warnings.append(Warning(checker_name, text, args, rule))
 
-    def add_error(self, checker_name: str, text: str) -> None:
-        """Add a checker error to the item."""
-        self.warnings.append(Error(checker_name, text))
+    def add_error(self, checker_name: str, text, *args, rule: str = "") -> None:
+        """
+        Add a checker error to the item.
+
+        `text` is either the text of the error, a format string or a
+        function, rendered with `args` when the error is displayed.
+        """
+        if rule in self.ignored_rules:
+            return
+        self.warnings.append(Error(checker_name, text, args, rule))
 
 
 class PoFile:
@@ -107,23 +135,91 @@ class PoFile:
         """Initializer."""
         self.content: List[PoItem] = []
         self.path = path
+        # diff of the file in a pull request, None when not in a pull request
+        self.diff = None
+        # fields of the header entry (msgid "")
+        self.headers: Dict[str, str] = {}
         if path:
             self.parse_file(path)
 
+    @classmethod
+    def from_stream(cls, stream, path="<stream>") -> "PoFile":
+        """Return a `PoFile` parsed from a text stream (iterable of lines)."""
+        pofile = cls()
+        pofile.path = path
+        pofile.parse_lines(stream)
+        return pofile
+
+    @classmethod
+    def from_string(cls, content: str, path="<string>") -> "PoFile":
+        """Return a `PoFile` parsed from the content of a `*.po` file."""
+        # like files opened in text mode: lines are split on newlines only
+        return cls.from_stream(io.StringIO(content, newline=None), path)
+
+    @classmethod
+    def from_bytes(cls, content: bytes, path="<bytes>") -> "PoFile":
+        """Return a `PoFile` parsed from the UTF-8 content of a `*.po` file."""
+        return cls.from_string(content.decode("utf8"), path)
+
     def parse_file(self, path):
         """Parse a `*.po` file according to its path."""
         # TODO assert path is a file, not a dir
-        item = None
         with open(path, encoding="utf8") as f:
-            for lineno, line in enumerate(f):
-                if line.startswith("#: "):
-                    if item:
+            self.parse_lines(f)
+
+    def parse_lines(self, lines, on_item=None):
+        """
+        Parse the lines of a `*.po` file (each line ending with a newline).
+
+        `on_item` is called on each item as soon as it is parsed, the item
+        being kept in the content only when it returns True.
+        """
+        item = None
+        header = PoItem("#: ", 1)
+        # ignored rules found before the "#: " line of the next item
+        next_ignored_rules = frozenset()
+        for lineno, line in enumerate(lines):
+            if line.startswith("#: ") and item and item.parsing_msgid is None:
+                item.append_line(line)  # references wrapped on several lines
+            elif line.startswith("#: "):
+                if item:
+                    if on_item is None or on_item(item):
                         self.content.append(item)
-                    item = PoItem(line, lineno + 1)
-                elif item:
-                    item.append_line(line)
+                else:
+                    self.parse_headers(header.msgstr_full_content)
+                item = PoItem(line, lineno + 1)
+                item.ignored_rules = next_ignored_rules
+                next_ignored_rules = frozenset()
+            elif item:
+                item.append_line(line)
+            else:
+                header.append_line(line)
+            if line.startswith("#."):
+                match = IGNORE_COMMENT.match(line)
+                if not match:
+                    continue
+                rules = frozenset(match.group(1).split(","))
+                if item is None or item.parsing_msgid is not None:
+                    next_ignored_rules |= rules
+                else:
+                    item.ignored_rules |= rules
         if item:
-            self.content.append(item)
+            if on_item is None or on_item(item):
+                self.content.append(item)
+        else:
+            self.parse_headers(header.msgstr_full_content)
+
+    def parse_headers(self, content: str) -> None:
+        """Parse the content of the header entry ("Name: value\\n" lines)."""
+        for line in content.split("\\n"):
+            name, separator, value = line.partition(":")
+            if separator:
+                self.headers[name.strip()] = value.strip()
+
+    @property
+    def language(self) -> str:
+        """Language of the translations (from the header), may be empty."""
+        return self.headers.get("Language", "")
 
     def __str__(self):
         """Return string representation."""
@@ -135,9 +231,9 @@ class PoFile:
         """Escape reStructuredText markup."""
         return "\n\n".join(item.msgstr_rst2txt for item in self.content)
 
-    def display_warnings(self, pull_request_info=None):
+    def display_warnings(self):
         """Log warnings and errors, return errors and warnings lists."""
-        self.tag_in_pull_request(pull_request_info)
+        self.tag_in_pull_request()
         errors = []
         warnings = []
         for item in self.content:
@@ -168,45 +264,98 @@ class PoFile:
                     warnings.append(message)
         return errors, warnings
 
-    def tag_in_pull_request(self, pull_request_info):
-        """Tag items being part of the pull request."""
-        if not pull_request_info:
-            for item in self.content:
-                item.inside_pull_request = True
-        else:
-            diff = pull_request_info.diff(self.path)
-            for item in self.content:
-                item.inside_pull_request = False
-            for lineno_diff in self.lines_in_diff(diff):
-                for item in self.content:
-                    if item.lineno_start <= lineno_diff <= item.lineno_end:
-                        item.inside_pull_request = True
+    def errors_and_warnings(self):
+        """Return errors and warnings lists, without logging them."""
+        self.tag_in_pull_request()
+        errors = []
+        warnings = []
+        for item in self.content:
+            if not item.inside_pull_request:
+                continue
+            for message in item.warnings:
+                if isinstance(message, Error):
+                    errors.append(message)
+                elif isinstance(message, Warning):
+                    warnings.append(message)
+        return errors, warnings
+
+    def tag_in_pull_request(self):
+        """Tag items changed by the diff (all the items without diff)."""
+        for item in self.content:
+            item.inside_pull_request = self.diff is None
+        if self.diff is None:
+            return
+        for item in self.items_at_lines(self.lines_in_diff(self.diff)):
+            item.inside_pull_request = True
+
+    def items_at_lines(self, linenos) -> List[PoItem]:
+        """Return the items containing some lines (in file order)."""
+        starts = [item.lineno_start for item in self.content]
+        indexes = set()
+        for lineno in linenos:
+            index = bisect.bisect_right(starts, lineno) - 1
+            if index >= 0 and lineno <= self.content[index].lineno_end:
+                indexes.add(index)
+        return [self.content[index] for index in sorted(indexes)]
 
     @staticmethod
     def lines_in_diff(diff):
-        """Yield line numbers modified in a diff (new line numbers)."""
-        for line in diff.splitlines():
-            if line.startswith("@@"):
-                match = re.search(r"@@\s*\-\d+,\d+\s+\+(\d+),(\d+)\s+@@", line)
-                if match:
-                    line_start = int(match.group(1))
-                    nb_lines = int(match.group(2))
-                    # github add 3 extra lines around diff info
-                    extra_info_lines = 3
-                    for lineno in range(
-                        line_start + extra_info_lines,
-                        line_start + nb_lines - extra_info_lines,
-                    ):
-                        yield lineno
+        """
+        Yield line numbers modified in a unified diff (new line numbers).
+
+        Added lines are modified lines. Removed lines modify the line before
+        them, when there is no added line at their place.
+        """
+        new_lineno = None  # next line number in the new file
+        removed = False  # lines removed before new_lineno, not replaced
+        # not splitlines(): msgstr text may contain other line separators
+        for line in diff.split("\n"):
+            match = HUNK_HEADER.match(line)
+            if match or line.startswith(" ") or not line:
+                if removed and new_lineno > 1:
+                    yield new_lineno - 1
+                removed = False
+            if match:
+                new_lineno = int(match.group(1))
+            elif new_lineno is None or line.startswith("\\"):
+                continue  # before the first hunk, or "\ No newline at end of file"
+            elif line.startswith("+"):
+                yield new_lineno
+                new_lineno += 1
+                removed = False
+            elif line.startswith("-"):
+                removed = True
+            else:
+                new_lineno += 1
+        if removed and new_lineno > 1:
+            yield new_lineno - 1
 
 
 class Message:
-    """Checker message."""
+    """
+    Checker message.
+
+    To keep messages small, the text is rendered only when it is needed,
+    from a template (format string or function) and its arguments.
+    """
 
-    def __init__(self, checker_name: str, text: str):
+    __slots__ = ("checker_name", "rule", "template", "args")
+
+    def __init__(self, checker_name: str, text, args=(), rule: str = ""):
         """Initializer."""
         self.checker_name = checker_name
-        self.text = text
+        self.rule = rule
+        self.template = text
+        self.args = args
+
+    @property
+    def text(self) -> str:
+        """Text of the message."""
+        if callable(self.template):
+            return self.template(*self.args)
+        if self.args:
+            return self.template.format(*self.args)
+        return self.template
 
     def __str__(self):
         """Return string representation."""
@@ -220,6 +369,10 @@ class Message:
 class Warning(Message):
     """Checker warning message."""
 
+    __slots__ = ()
+
 
 class Error(Message):
     """Checker error message."""
+
+    __slots__ = ()
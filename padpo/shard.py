@@ -0,0 +1,156 @@
+"""Split directory runs into balanced shards, and merge their results."""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import simplelogging
+
+from padpo.cache import write_atomically
+from padpo.pofile import Error, PoFile
+
+log = simplelogging.get_logger()
+
+# increment when the format of shard results changes
+RESULTS_VERSION = 1
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Return (K, N) from a `K/N` command line argument."""
+    try:
+        shard, shards = (int(number) for number in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, expected K/N")
+    if not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, K must be 1..N")
+    return shard, shards
+
+
+def count_items(content: bytes) -> int:
+    """Return the number of items of the content of a `*.po` file."""
+    return content.count(b"\n#: ") + content.startswith(b"#: ")
+
+
+class ItemCountIndex:
+    """Number of items of `*.po` files, stored with their size and mtime."""
+
+    def __init__(self, path=None):
+        """Initializer."""
+        self.path = Path(path) if path else None
+        self._counts = {}
+        self._modified = False
+        if self.path:
+            try:
+                self._counts = json.loads(self.path.read_text(encoding="utf8"))
+            except (OSError, ValueError):
+                pass
+
+    def count(self, filepath) -> int:
+        """Return the number of items of a `*.po` file."""
+        stat = os.stat(filepath)
+        key = str(filepath)
+        entry = self._counts.get(key)
+        if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return entry[2]
+        count = count_items(Path(filepath).read_bytes())
+        self._counts[key] = [stat.st_size, stat.st_mtime_ns, count]
+        self._modified = True
+        return count
+
+    def save(self) -> None:
+        """Store the index, if it changed."""
+        if not self.path or not self._modified:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomically(self.path, json.dumps(self._counts))
+        except OSError as exc:
+            log.warning("Unable to store item counts: %s", exc)
+
+
+def select_shard(filepaths, shard: int, shards: int, index: ItemCountIndex) -> List:
+    """
+    Return the files of shard K (1..N) out of N.
+
+    Files are sorted by decreasing number of items, then each one is given to
+    the least loaded shard. The partition only depends on the paths and the
+    contents of the files, so each CI node computes the same one.
+    """
+    weights = sorted(
+        ((index.count(filepath) + 1, str(filepath)) for filepath in filepaths),
+        key=lambda weight: (-weight[0], weight[1]),
+    )
+    loads = [0] * shards
+    selected = set()
+    for weight, name in weights:
+        target = min(range(shards), key=lambda number: (loads[number], number))
+        loads[target] += weight
+        if target == shard - 1:
+            selected.add(name)
+    return sorted(
+        (filepath for filepath in filepaths if str(filepath) in selected), key=str
+    )
+
+
+class ShardResults:
+    """Messages of the files checked by a shard, to be merged later."""
+
+    def __init__(self, shard: str = ""):
+        """Initializer."""
+        self.shard = shard  # "K/N", empty when the run is not sharded
+        self.files = []
+        self.messages = []
+
+    def add_file(self, pofile: PoFile) -> None:
+        """Record the messages of a checked file."""
+        pofile.tag_in_pull_request()
+        self.files.append(str(pofile.path))
+        for item in pofile.content:
+            if not item.inside_pull_request:
+                continue
+            for message in item.warnings:
+                self.messages.append(
+                    {
+                        "path": str(pofile.path),
+                        "line": item.lineno_start,
+                        "level": "error" if isinstance(message, Error) else "warning",
+                        "checker": message.checker_name,
+                        "rule": message.rule,
+                        "text": message.text,
+                    }
+                )
+
+    def write(self, path) -> None:
+        """Write the results in JSON."""
+        data = {
+            "version": RESULTS_VERSION,
+            "shard": self.shard,
+            "files": self.files,
+            "messages": self.messages,
+        }
+        Path(path).write_text(
+            json.dumps(data, indent=1, ensure_ascii=False), encoding="utf8"
+        )
+
+    @classmethod
+    def read(cls, path) -> "ShardResults":
+        """Read results written by `write`."""
+        data = json.loads(Path(path).read_text(encoding="utf8"))
+        if data.get("version") != RESULTS_VERSION:
+            raise ValueError(f"{path}: unsupported results version")
+        results = cls(data["shard"])
+        results.files = data["files"]
+        results.messages = data["messages"]
+        return results
+
+
+def missing_shards(results: List[ShardResults]) -> List[str]:
+    """Return the shards (K/N) missing to get a full run."""
+    shards = {result.shard for result in results if result.shard}
+    if not shards:
+        return []
+    count = max(int(shard.split("/")[1]) for shard in shards)
+    expected = {f"{shard}/{count}" for shard in range(1, count + 1)}
+    return sorted(expected - shards, key=lambda shard: int(shard.split("/")[0]))
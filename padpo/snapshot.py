@@ -0,0 +1,136 @@
+"""Store of checker results, keyed by git blob SHA."""
+
+import hashlib
+import importlib.metadata
+import json
+from pathlib import Path
+from typing import Optional
+
+import simplelogging
+
+from padpo.cache import write_atomically
+from padpo.pofile import Error, PoFile, PoItem
+
+log = simplelogging.get_logger()
+
+# increment when the format of snapshots changes
+SNAPSHOT_VERSION = 2
+
+# rules of messages saying that a file was not fully checked (budget
+# exceeded): such results are not stored, the file is checked next time
+NOT_CHECKED_RULES = frozenset({"grammalecte-not-checked"})
+
+
+def checkers_fingerprint(checkers, suppressions=None) -> str:
+    """Return a fingerprint of padpo version and checkers configuration."""
+    try:
+        version = importlib.metadata.version("padpo")
+    except importlib.metadata.PackageNotFoundError:  # run from a source checkout
+        version = ""
+    digest = hashlib.sha256(f"{SNAPSHOT_VERSION}\0{version}".encode("utf8"))
+    for checker in checkers:
+        digest.update(b"\0" + checker.name.encode("utf8"))
+        digest.update(b"\0" + checker.fingerprint().encode("utf8"))
+    if suppressions:
+        digest.update(b"\0" + suppressions.fingerprint().encode("utf8"))
+    return digest.hexdigest()[:16]
+
+
+class SnapshotStore:
+    """Results of already checked files, keyed by git blob SHA."""
+
+    def __init__(self, directory, checkers, suppressions=None):
+        """Initializer."""
+        self.directory = Path(directory) / checkers_fingerprint(checkers, suppressions)
+
+    def _snapshot_path(self, sha: str) -> Path:
+        return self.directory / sha[:2] / f"{sha}.json"
+
+    def load(self, sha: str, path, diff=None) -> Optional[PoFile]:
+        """
+        Return a `PoFile` holding the results stored for a blob, if any.
+
+        Results are returned only if the items changed by the diff (all the
+        items without diff) were checked.
+        """
+        try:
+            data = json.loads(self._snapshot_path(sha).read_text(encoding="utf8"))
+        except (OSError, ValueError):
+            return None
+        pofile = PoFile()
+        pofile.path = path
+        try:
+            for item_data in data["items"]:
+                lineno_start, lineno_end, fuzzy, msgid, msgstr, messages = item_data
+                item = PoItem("#: ", lineno_start)
+                item.lineno_end = lineno_end
+                item.fuzzy = fuzzy
+                item.msgid = [msgid]
+                item.msgstr = [msgstr]
+                for level, checker_name, rule, text in messages:
+                    if level == "error":
+                        item.add_error(checker_name, text, rule=rule)
+                    else:
+                        item.add_warning(checker_name, text, rule=rule)
+                pofile.content.append(item)
+        except (KeyError, TypeError, ValueError):
+            log.debug("Snapshot %s has an unknown format", sha)
+            return None
+        checked = data.get("checked")
+        if checked is not None:
+            if diff is None:
+                required = pofile.content
+            else:
+                required = pofile.items_at_lines(pofile.lines_in_diff(diff))
+            indexes = {id(item): index for index, item in enumerate(pofile.content)}
+            if not {indexes[id(item)] for item in required}.issubset(checked):
+                return None
+        log.debug("Results of %s found in snapshot %s", path, sha)
+        return pofile
+
+    def save(self, sha: str, pofile: PoFile) -> None:
+        """Store the results of a checked file, unless it was not fully checked."""
+        if any(
+            message.rule in NOT_CHECKED_RULES
+            for item in pofile.content
+            for message in item.warnings
+        ):
+            return
+        items = []
+        for item in pofile.content:
+            messages = [
+                (
+                    "error" if isinstance(message, Error) else "warning",
+                    message.checker_name,
+                    message.rule,
+                    message.text,
+                )
+                for message in item.warnings
+            ]
+            items.append(
+                (
+                    item.lineno_start,
+                    item.lineno_end,
+                    item.fuzzy,
+                    item.msgid_full_content,
+                    item.msgstr_full_content,
+                    messages,
+                )
+            )
+        checked = None  # all the items
+        if pofile.diff is not None:
+            pofile.tag_in_pull_request()
+            checked = [
+                index
+                for index, item in enumerate(pofile.content)
+                if item.inside_pull_request
+            ]
+        snapshot_path = self._snapshot_path(sha)
+        try:
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            # concurrent runs never read partial files
+            write_atomically(
+                snapshot_path, json.dumps({"items": items, "checked": checked})
+            )
+        except OSError as exc:
+            log.warning("Unable to store snapshot of %s: %s", pofile.path, exc)
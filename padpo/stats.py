@@ -0,0 +1,157 @@
+"""Statistics on checked `*.po` files."""
+
+import json
+from collections import defaultdict
+from pathlib import PurePath
+
+from padpo.pofile import Error, PoFile
+
+COUNTERS = ("items", "translated", "fuzzy", "empty", "errors", "warnings")
+# number of the slowest files given for each timed checker
+SLOWEST_FILES = 10
+
+
+class MessageCounts:
+    """Numbers of errors and warnings, for runs that do not keep messages."""
+
+    def __init__(self):
+        """Initializer."""
+        self.errors = 0
+        self.warnings = 0
+        self.stopped = False  # True when the run stopped before the last file
+
+    def add(self, errors, warnings) -> None:
+        """Count the errors and warnings (lists of messages) of a file."""
+        self.errors += len(errors)
+        self.warnings += len(warnings)
+
+    def __str__(self):
+        """Return a summary of the counts."""
+        text = f"errors: {self.errors}, warnings: {self.warnings}"
+        if self.stopped:
+            text += " (stopped before checking all the files)"
+        return text
+
+
+class Statistics:
+    """Counts of items and messages, by checker, by file and by directory."""
+
+    def __init__(self):
+        """Initializer."""
+        self.checkers = defaultdict(lambda: {"errors": 0, "warnings": 0})
+        self.files = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.directories = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.total = dict.fromkeys(COUNTERS, 0)
+        # checker name => seconds by file, and overruns (file => reason)
+        self.timings = {}
+        self.overruns = {}
+
+    def add_timings(self, checker) -> None:
+        """Record the time spent by a checker on each file, if it is timed."""
+        timings = getattr(checker, "timings", None)
+        if timings:
+            self.timings[checker.name] = dict(timings)
+            self.overruns[checker.name] = dict(getattr(checker, "overruns", {}))
+
+    def slowest_files(self, checker_name: str):
+        """Return the slowest files of a checker, as (path, seconds) tuples."""
+        timings = self.timings[checker_name]
+        return sorted(timings.items(), key=lambda timing: -timing[1])[:SLOWEST_FILES]
+
+    def add_file(self, pofile: PoFile) -> None:
+        """Count items and messages of a checked file."""
+        pofile.tag_in_pull_request()
+        counts = self.files[str(pofile.path)]
+        for item in pofile.content:
+            counts["items"] += 1
+            if item.fuzzy:
+                counts["fuzzy"] += 1
+            elif item.msgstr_full_content:
+                counts["translated"] += 1
+            elif item.msgid_full_content:
+                counts["empty"] += 1
+            if not item.inside_pull_request:
+                continue
+            for message in item.warnings:
+                level = "errors" if isinstance(message, Error) else "warnings"
+                counts[level] += 1
+                self.checkers[message.checker_name][level] += 1
+        directory = self.directories[str(PurePath(pofile.path).parent)]
+        for counter in COUNTERS:
+            directory[counter] += counts[counter]
+            self.total[counter] += counts[counter]
+
+    def as_dict(self):
+        """Return statistics as a JSON serializable dict."""
+        data = {
+            "total": self.total,
+            "checkers": dict(sorted(self.checkers.items())),
+            "directories": dict(sorted(self.directories.items())),
+            "files": dict(sorted(self.files.items())),
+        }
+        if self.timings:
+            data["timings"] = {
+                name: {
+                    "seconds": round(sum(timings.values()), 3),
+                    "slowest": [
+                        [path, round(seconds, 3)]
+                        for path, seconds in self.slowest_files(name)
+                    ],
+                    "overruns": dict(sorted(self.overruns[name].items())),
+                }
+                for name, timings in sorted(self.timings.items())
+            }
+        return data
+
+    def to_json(self) -> str:
+        """Return statistics in JSON."""
+        return json.dumps(self.as_dict(), indent=2, ensure_ascii=False)
+
+    def to_table(self) -> str:
+        """Return statistics as text tables."""
+        width = max(
+            [len("Directory")]
+            + [len(name) for name in self.checkers]
+            + [len(name) for name in self.directories]
+            + [len(name) for name in self.files]
+        )
+        lines = [f"{'Checker':<{width}} {'Errors':>8} {'Warnings':>8}"]
+        for name, counts in sorted(self.checkers.items()):
+            lines.append(
+                f"{name:<{width}} {counts['errors']:>8} {counts['warnings']:>8}"
+            )
+        for title, table in (
+            ("Directory", self.directories),
+            ("File", self.files),
+            ("Total", {"": self.total}),
+        ):
+            lines.append("")
+            lines.append(
+                f"{title:<{width}} {'Items':>7} {'Transl.':>7} {'Fuzzy':>7} "
+                f"{'Empty':>7} {'Errors':>8} {'Warnings':>8}"
+            )
+            for name, counts in sorted(table.items()):
+                lines.append(
+                    f"{name:<{width}} {counts['items']:>7} "
+                    f"{self.ratio(counts, 'translated'):>7} "
+                    f"{self.ratio(counts, 'fuzzy'):>7} "
+                    f"{self.ratio(counts, 'empty'):>7} "
+                    f"{counts['errors']:>8} {counts['warnings']:>8}"
+                )
+        for name, timings in sorted(self.timings.items()):
+            lines.append("")
+            lines.append(f"{'Slowest files (' + name + ')':<{width}} {'Seconds':>8}")
+            for path, seconds in self.slowest_files(name):
+                overrun = self.overruns[name].get(path)
+                lines.append(
+                    f"{path:<{width}} {seconds:>8.2f}"
+                    + (f"  not checked: {overrun}" if overrun else "")
+                )
+        return "\n".join(lines)
+
+    @staticmethod
+    def ratio(counts, counter: str) -> str:
+        """Return the percentage of items for a counter."""
+        if not counts["items"]:
+            return "-"
+        return f"{100 * counts[counter] / counts['items']:.1f}%"
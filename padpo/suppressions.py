@@ -0,0 +1,84 @@
+"""Rules ignored per file and per item, read from suppression files."""
+
+from collections import defaultdict
+from pathlib import Path, PurePath
+from typing import FrozenSet, List, Optional, Tuple
+
+import simplelogging
+
+from padpo.pofile import PoFile, PoItem
+
+log = simplelogging.get_logger()
+
+
+class SuppressionIndex:
+    """
+    Index of the rules to ignore, by file and by item.
+
+    Each line of a suppression file is `PATH[:LINE] CODE[,CODE...]` where:
+
+    * PATH is a pattern matched against the end of the `*.po` file path,
+    * LINE is a line of the item to ignore (the whole file when omitted),
+    * CODE is a rule code (`nbsp-quotes`) or a checker code (`nbsp`).
+
+    Empty lines and lines starting with `#` are ignored.
+    """
+
+    def __init__(self):
+        """Initializer."""
+        # pattern => line (None for the whole file) => ignored rules
+        self._index = defaultdict(lambda: defaultdict(frozenset))
+
+    def load(self, path) -> None:
+        """Add the content of a suppression file to the index."""
+        lines = Path(path).read_text(encoding="utf8").splitlines()
+        for lineno, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                location, codes = line.split()
+            except ValueError:
+                log.warning("%s:%d: invalid suppression: %s", path, lineno, line)
+                continue
+            pattern, _, item_line = location.rpartition(":")
+            if not pattern or not item_line.isdigit():
+                pattern, item_line = location, None
+            else:
+                item_line = int(item_line)
+            self._index[pattern][item_line] |= frozenset(codes.split(","))
+
+    def apply(self, pofile: PoFile) -> None:
+        """Add the ignored rules of the index to the items of a file."""
+        rules_by_line = self.rules_by_line(pofile.path)
+        if not rules_by_line:
+            return
+        for item in pofile.content:
+            self.apply_item(rules_by_line, item)
+
+    def rules_by_line(self, path) -> List[Tuple[Optional[int], FrozenSet[str]]]:
+        """Return the (line, rules) ignored in a file (line is None for the file)."""
+        path = PurePath(path)
+        return [
+            (line, rules)
+            for pattern, rules_by_line in self._index.items()
+            if path.match(pattern)
+            for line, rules in rules_by_line.items()
+        ]
+
+    @staticmethod
+    def apply_item(rules_by_line, item: PoItem) -> None:
+        """Add ignored rules (see `rules_by_line`) to an item."""
+        for line, rules in rules_by_line:
+            if line is None or item.lineno_start <= line <= item.lineno_end:
+                item.ignored_rules |= rules
+
+    def fingerprint(self) -> str:
+        """Return a string identifying the content of the index."""
+        return repr(
+            sorted(
+                (pattern, str(line), sorted(rules))
+                for pattern, rules_by_line in self._index.items()
+                for line, rules in rules_by_line.items()
+            )
+        )
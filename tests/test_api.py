@@ -0,0 +1,29 @@
+"""Test the library API."""
+
+import logging
+from pathlib import Path
+
+import padpo
+
+PO_DIRECTORY = Path(__file__).parent / "po_with_warnings"
+
+
+def test_lint_paths(caplog):
+    """Results of files are returned, and nothing is logged."""
+    caplog.set_level(logging.DEBUG)
+    results = list(padpo.lint(PO_DIRECTORY, jobs=2))
+    assert [(result.line, result.level, result.rule) for result in results] == [
+        (1, "warning", "glossary")
+    ]
+    assert results[0].path == str(PO_DIRECTORY / "tuple.po")
+    assert "n-uplet" in results[0].text
+    assert not caplog.records
+
+
+def test_lint_bytes():
+    """Content of a file can be checked."""
+    content = (PO_DIRECTORY / "tuple.po").read_bytes()
+    results = list(padpo.lint(content, path="tuple.po"))
+    assert [(result.path, result.checker) for result in results] == [
+        ("tuple.po", "Glossary")
+    ]
@@ -0,0 +1,66 @@
+"""Test calls run within time and memory budgets."""
+
+import os
+import time
+
+import pytest
+
+from padpo.budget import BudgetExceeded, WorkerPool, resource
+
+
+def process_id(_):
+    """Return the process running the call."""
+    return os.getpid()
+
+
+def slow_start():
+    """Initialize a worker slowly."""
+    time.sleep(1.5)
+
+
+def test_worker_reused():
+    """Workers are started once, their startup is not in the budget."""
+    pool = WorkerPool(slow_start)
+    try:
+        assert pool.call(len, "abc", timeout=1) == 3
+        first_process = pool.call(process_id, None, timeout=1)
+        assert pool.call(process_id, None, timeout=1) == first_process
+        assert first_process != os.getpid()
+    finally:
+        pool.close()
+
+
+def test_time_budget():
+    """Calls lasting too long are stopped, the worker is started again."""
+    pool = WorkerPool()
+    try:
+        first_process = pool.call(process_id, None, timeout=60)
+        start = time.perf_counter()
+        with pytest.raises(BudgetExceeded, match="time budget exceeded"):
+            pool.call(time.sleep, 60, timeout=1)
+        assert time.perf_counter() - start < 30
+        assert pool.call(process_id, None, timeout=60) != first_process
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(resource is None, reason="memory budgets need Unix")
+def test_memory_budget():
+    """Calls using too much memory are stopped."""
+    pool = WorkerPool(memory=2**30)
+    try:
+        with pytest.raises(BudgetExceeded, match="memory"):
+            pool.call(bytearray, 2**32, timeout=60)
+        assert pool.call(len, "abc", timeout=60) == 3
+    finally:
+        pool.close()
+
+
+def test_errors():
+    """Errors of the call are raised again."""
+    pool = WorkerPool()
+    try:
+        with pytest.raises(RuntimeError, match="ValueError"):
+            pool.call(int, "not a number", timeout=60)
+    finally:
+        pool.close()
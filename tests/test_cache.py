@@ -0,0 +1,20 @@
+"""Test the helpers of the local caches."""
+
+import pytest
+
+from padpo.cache import write_atomically
+
+
+def test_write_atomically(tmp_path):
+    """Files are replaced with their mode, failed writes leave no file."""
+    path = tmp_path / "file.json"
+    path.write_text("old", encoding="utf8")
+    path.chmod(0o640)
+    write_atomically(path, "new")
+    assert path.read_text(encoding="utf8") == "new"
+    assert path.stat().st_mode & 0o777 == 0o640
+
+    with pytest.raises(TypeError):
+        write_atomically(path, None)
+    assert path.read_text(encoding="utf8") == "new"
+    assert [child.name for child in tmp_path.iterdir()] == ["file.json"]
@@ -0,0 +1,35 @@
+"""Test checkers shared by threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from padpo.padpo import check_paths, parse_and_check
+
+PO_FILES = sorted(Path(__file__).parent.rglob("*.po"))
+
+
+def messages(pofile):
+    """Return the messages of a checked file."""
+    return [
+        (item.lineno_start, message.checker_name, message.rule, message.text)
+        for item in pofile.content
+        for message in item.warnings
+    ]
+
+
+def test_threads_give_same_results():
+    """Files checked concurrently get the same messages as checked alone."""
+    expected = [messages(parse_and_check(path)) for path in PO_FILES]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(parse_and_check, PO_FILES * 20))
+    assert [messages(pofile) for pofile in results] == expected * 20
+
+
+def test_jobs():
+    """Messages are reported in the same order, whatever the number of jobs."""
+    paths = [Path(__file__).parent / "po_without_warnings", PO_FILES[0]]
+    results = []
+    for jobs in (1, 4):
+        errors, warnings = check_paths(paths, jobs=jobs)
+        results.append([message.text for message in errors + warnings])
+    assert results[0] == results[1]
@@ -0,0 +1,58 @@
+"""Test the runs stopping at the first errors."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from padpo.padpo import bounded_map, check_paths
+from padpo.stats import MessageCounts
+
+ERROR_ENTRY = '#: a.rst:1\nmsgid "Why?"\nmsgstr "Pourquoi?"\n'
+
+
+@pytest.fixture
+def error_files(tmp_path):
+    """Directory of 20 files with one error each."""
+    for index in range(20):
+        (tmp_path / f"file{index:02}.po").write_text(ERROR_ENTRY, encoding="utf8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_max_errors(error_files, jobs):
+    """Files are not checked anymore once the maximum number of errors is found."""
+    counts = MessageCounts()
+    errors, warnings = check_paths(
+        [error_files], jobs=jobs, max_errors=3, counts=counts, display=False
+    )
+    assert (errors, warnings) == ([], [])  # only counted
+    assert counts.errors == 3
+    assert counts.stopped
+    assert "stopped" in str(counts)
+
+
+def test_all_errors(error_files):
+    """Without a maximum, all the files are checked."""
+    counts = MessageCounts()
+    check_paths([error_files], counts=counts, display=False)
+    assert counts.errors == 20
+    assert not counts.stopped
+
+
+def test_bounded_map():
+    """Results are in order, and only a few calls are submitted in advance."""
+    submitted = []
+
+    def function(argument):
+        return argument * 2
+
+    def arguments():
+        for argument in range(10):
+            submitted.append(argument)
+            yield argument
+
+    with ThreadPoolExecutor(2) as pool:
+        results = bounded_map(pool, function, arguments(), 3)
+        assert next(results) == 0
+        assert len(submitted) == 3
+        assert list(results) == [2 * argument for argument in range(1, 10)]
@@ -0,0 +1,72 @@
+"""Test the automatic fixes of `*.po` files."""
+
+from padpo.checkers.linelength import LineLengthChecker
+from padpo.checkers.nbsp import NonBreakableSpaceChecker
+from padpo.fix import apply_edits, fix_file, wrap
+from padpo.pofile import PoFile
+
+NBSP = " "
+
+
+def test_apply_edits():
+    """Edits are applied from the start, overlapping edits are skipped."""
+    assert apply_edits("abcdef", [(4, 5, "E"), (0, 1, "A"), (0, 2, "X")]) == "AbcdEf"
+
+
+def test_wrap():
+    """Short contents stay on the keyword line, long ones are wrapped."""
+    assert wrap("msgstr", "court") == ['msgstr "court"\n']
+    lines = wrap("msgstr", "mot " * 30)
+    assert lines[0] == 'msgstr ""\n'
+    assert all(len(line) <= 80 for line in lines)
+    assert "".join(line[1:-2] for line in lines[1:]) == "mot " * 30
+
+
+def test_fix_file(tmp_path):
+    """Missing non-breakable spaces are added, and long lines wrapped."""
+    path = tmp_path / "fix.po"
+    path.write_text(
+        'msgid ""\n'
+        'msgstr ""\n'
+        '"Language: fr\\n"\n'
+        "\n"
+        "#: ../Doc/library/foo.rst:1\n"
+        'msgid "Use this: see ``a:b`` below"\n'
+        'msgstr "Utilisez « ceci »: voir ``a:b`` ci-dessous, ou '
+        'https://example.com/ab, qui est un lien bien trop long"\n',
+        encoding="utf8",
+    )
+    checkers = [NonBreakableSpaceChecker(), LineLengthChecker()]
+    assert fix_file(path, checkers) == 1
+    pofile = PoFile(path)
+    assert pofile.content[0].msgstr_full_content == (
+        f"Utilisez «{NBSP}ceci{NBSP}»{NBSP}: voir ``a:b`` ci-dessous, ou "
+        "https://example.com/ab, qui est un lien bien trop long"
+    )
+    for checker in checkers:
+        checker.check_file(pofile)
+    assert not pofile.content[0].warnings
+    assert fix_file(path, checkers) == 0
+
+
+def test_fix_crlf_file(tmp_path):
+    """CRLF files are parsed correctly, and fixed with CRLF line endings."""
+    path = tmp_path / "crlf.po"
+    path.write_bytes(
+        (
+            "#: ../Doc/library/foo.rst:1\r\n"
+            'msgid "Why?"\r\n'
+            'msgstr "Pourquoi?"\r\n'
+            "\r\n"
+            "#: ../Doc/library/foo.rst:2\r\n"
+            'msgid "Long"\r\n'
+            'msgstr "' + "mot " * 30 + '"\r\n'
+        ).encode("utf8")
+    )
+    checkers = [NonBreakableSpaceChecker(), LineLengthChecker()]
+    assert fix_file(path, checkers) == 2
+    content = path.read_bytes().decode("utf8")
+    assert "\n" not in content.replace("\r\n", "")
+    pofile = PoFile(path)
+    assert pofile.content[0].msgstr_full_content == f"Pourquoi{NBSP}?"
+    assert pofile.content[1].msgstr_full_content == "mot " * 30
@@ -0,0 +1,36 @@
+"""Test glossary files."""
+
+import json
+
+from padpo.checkers.glossary import DEFAULT_GLOSSARY, load_glossary
+
+
+def test_additional_glossaries(tmp_path):
+    """Terms of later glossary files are added to (or replace) earlier ones."""
+    text_glossary = tmp_path / "glossary.txt"
+    text_glossary.write_text(
+        "# comment\nwidget: gadget | bidule  # comment\nbug: bestiole\n",
+        encoding="utf8",
+    )
+    json_glossary = tmp_path / "glossary.json"
+    json_glossary.write_text(json.dumps({"Frobnicate": ["frobniquer"]}))
+    glossary = load_glossary((DEFAULT_GLOSSARY, text_glossary, json_glossary))
+    assert glossary.terms["widget"] == ["gadget", "bidule"]
+    assert glossary.terms["bug"] == ["bestiole"]
+    assert "frobnicate" in glossary.lowercase_terms
+    matches = [term for term, _, _ in glossary.matching_entries("widget of bug")]
+    assert matches == ["widget"]
+
+
+def test_glossary_digest(tmp_path):
+    """Glossaries are built once, their digest changes with their content."""
+    glossary_file = tmp_path / "glossary.txt"
+    glossary_file.write_text("widget: gadget\n", encoding="utf8")
+    glossary = load_glossary((glossary_file,))
+    assert load_glossary((glossary_file,)) is glossary
+
+    glossary_file.write_text("widget: machin\n", encoding="utf8")
+    load_glossary.cache_clear()
+    new_glossary = load_glossary((glossary_file,))
+    assert new_glossary.digest != glossary.digest
+    assert new_glossary.terms == {"widget": ["machin"]}
@@ -0,0 +1,160 @@
+"""Test the items sent to Grammalecte."""
+
+import contextlib
+import time
+
+from pygrammalecte import GrammalecteSpellingMessage
+
+from padpo.budget import BudgetExceeded
+from padpo.checkers import grammalecte
+from padpo.checkers.grammalecte import (
+    GrammalecteChecker,
+    SentenceCache,
+    split_sentences,
+)
+from padpo.pofile import PoFile, PoItem
+
+
+def fake_grammalecte(texts):
+    """Return a fake `grammalecte_text` reporting the word `fôte`."""
+
+    def grammalecte_text(text):
+        texts.append(text)
+        for lineno, line in enumerate(text.split("\n"), start=1):
+            start = line.find("fôte")
+            if start >= 0:
+                yield GrammalecteSpellingMessage(lineno, start, start + 4, "fôte")
+
+    return grammalecte_text
+
+
+def make_pofile(*entries):
+    """Return a `PoFile` made of (msgid, msgstr) entries."""
+    pofile = PoFile()
+    pofile.path = "test.po"
+    for lineno, (msgid, msgstr) in enumerate(entries):
+        item = PoItem("test.po", 4 * lineno + 1)
+        item.msgid = [msgid]
+        item.msgstr = [msgstr]
+        pofile.content.append(item)
+    return pofile
+
+
+def test_prefilter(monkeypatch):
+    """Empty, code-only, copied and already checked items are skipped."""
+    texts = []
+    monkeypatch.setattr(grammalecte, "grammalecte_text", fake_grammalecte(texts))
+    pofile = make_pofile(
+        ("Empty", ""),
+        ("``code``", "``code``"),
+        ("Use ``code``.", "Utilisez ``code``."),
+        ("Copy", "Copy"),
+        ("A mistake", "Une fôte"),
+        ("Mistake", "Une fôte"),
+    )
+    checker = GrammalecteChecker()
+    checker.check_file(pofile)
+    assert texts == ["Utilisez «\u00a0xxxx\u00a0».\n\nUne fôte"]
+    assert [len(item.warnings) for item in pofile.content] == [0, 0, 0, 0, 1, 1]
+    assert "Une fôte" in pofile.content[5].warnings[0].text
+
+    other_pofile = make_pofile(("Another mistake", "Une fôte"))
+    checker.check_file(other_pofile)
+    assert len(texts) == 1  # results found in cache
+    assert len(other_pofile.content[0].warnings) == 1
+    assert checker.skipped == {"empty": 1, "code-only": 1, "copy": 1, "cached": 2}
+
+
+def test_split_sentences():
+    """Sentences are found with their offsets in the text."""
+    text = "Une phrase.  Une autre ? Fin"
+    sentences = split_sentences(text)
+    assert sentences == [(0, "Une phrase."), (13, "Une autre ?"), (25, "Fin")]
+    for offset, sentence in sentences:
+        assert text[offset : offset + len(sentence)] == sentence
+
+
+def test_sentence_cache(monkeypatch, tmp_path):
+    """Sentences are checked once, messages are shifted to the item text."""
+    texts = []
+    monkeypatch.setattr(grammalecte, "grammalecte_text", fake_grammalecte(texts))
+    msgstr = "Une phrase assez longue pour tout décaler. Une fôte."
+    pofile = make_pofile(
+        ("A long sentence to shift everything. A mistake.", msgstr),
+        ("Another mistake.", "Une fôte."),
+    )
+    checker = GrammalecteChecker()
+    checker.cache = SentenceCache(tmp_path / "grammalecte.sqlite")
+    checker.check_file(pofile)
+    assert texts == ["Une phrase assez longue pour tout décaler.\n\nUne fôte."]
+    position = msgstr.index("fôte")
+    expected_context = msgstr[position - 40 : position + 4 + 10]
+    assert pofile.content[0].warnings[0].text.endswith(f"###{expected_context}###")
+    assert len(pofile.content[1].warnings) == 1
+
+    # new checker, same database
+    pofile = make_pofile(("A mistake.", "Une fôte."))
+    checker = GrammalecteChecker()
+    checker.cache = SentenceCache(tmp_path / "grammalecte.sqlite")
+    checker.check_file(pofile)
+    assert len(texts) == 1
+    assert len(pofile.content[0].warnings) == 1
+
+
+def test_budget_exceeded(monkeypatch):
+    """Items with new sentences are not checked when a budget is exceeded."""
+    texts = []
+    monkeypatch.setattr(grammalecte, "grammalecte_text", fake_grammalecte(texts))
+    checker = GrammalecteChecker()
+    checker.check_file(make_pofile(("A mistake", "Une fôte")))
+
+    class Worker:
+        def call(self, function, text, timeout):
+            raise BudgetExceeded(f"time budget exceeded ({timeout:g} s)")
+
+    class Workers:
+        @contextlib.contextmanager
+        def worker(self):
+            yield Worker()
+
+    checker.workers = Workers()
+    checker.file_timeout = 2
+    pofile = make_pofile(
+        ("Mistake", "Une fôte"), ("New", "Nouveau"), ("Other", "Autre")
+    )
+    checker.check_file(pofile)
+    assert [[message.rule for message in item.warnings] for item in pofile.content] == [
+        ["grammalecte-spelling"],
+        ["grammalecte-not-checked"],
+        [],
+    ]
+    assert pofile.content[1].warnings[0].text == (
+        "2 entries not checked by Grammalecte: time budget exceeded (2 s)"
+    )
+    assert checker.overruns == {"test.po": "time budget exceeded (2 s)"}
+    assert set(checker.timings) == {"test.po"}
+
+    checker.file_timeout = None
+    checker.run_timeout = 0
+    pofile = make_pofile(("New", "Nouveau"))
+    checker.check_file(pofile)
+    assert "run time budget exhausted" in pofile.content[0].warnings[0].text
+    assert len(texts) == 1
+
+
+def test_code_only_linear():
+    """Texts made of many empty quotes are classified without backtracking."""
+    start = time.perf_counter()
+    assert not grammalecte.CODE_ONLY.fullmatch("«  »" * 40 + "a")
+    assert grammalecte.CODE_ONLY.fullmatch("«  »" * 40 + "«")
+    assert time.perf_counter() - start < 1
+
+
+def test_ignored_rules():
+    """Entries ignoring the grammar and spelling rules are not checked."""
+    pofile = make_pofile(("A mistake", "Une fôte"))
+    item = pofile.content[0]
+    item.ignored_rules = frozenset({"grammalecte-grammar", "grammalecte-spelling"})
+    checker = GrammalecteChecker()
+    assert checker.is_ignored(item)
+    assert checker.skip_reason(item, checker.prepare_text(item)) == "ignored"
@@ -0,0 +1,255 @@
+"""
+Performance regression tests.
+
+Hot paths are run over the test corpora and over a generated corpus. Their
+time per item, relative to a calibration workload (to be independent of the
+speed of the machine), and their peak memory per item are compared with the
+baselines of `performance_baselines.json`.
+
+These tests measure wall-clock time, so they are skipped by default (a
+loaded machine or coverage tracing skews them): run them with
+`PADPO_PERFORMANCE_TESTS=1`, or with `tox -e performance` (CI runs them in
+a separate job, without coverage). Run with `PADPO_UPDATE_BASELINES=1` to
+store new baselines, after a change that is expected to change performance.
+"""
+
+import json
+import os
+import random
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from padpo.checkers import grammalecte
+from padpo.checkers.empty import EmptyChecker
+from padpo.checkers.fuzzy import FuzzyChecker
+from padpo.checkers.glossary import GlossaryChecker
+from padpo.checkers.grammalecte import GrammalecteChecker
+from padpo.checkers.linelength import LineLengthChecker
+from padpo.checkers.nbsp import NonBreakableSpaceChecker
+from padpo.pofile import PoFile, PoItem
+
+TESTS_DIR = Path(__file__).parent
+BASELINES_PATH = TESTS_DIR / "performance_baselines.json"
+UPDATE_BASELINES = bool(os.environ.get("PADPO_UPDATE_BASELINES"))
+pytestmark = pytest.mark.skipif(
+    not (os.environ.get("PADPO_PERFORMANCE_TESTS") or UPDATE_BASELINES),
+    reason="performance tests are run with PADPO_PERFORMANCE_TESTS=1",
+)
+# a case fails when it is this many times slower (or bigger) than its baseline
+TIME_TOLERANCE = 2.0
+MEMORY_TOLERANCE = 1.5
+# allocations (in bytes) not proportional to the corpus, like regex caches
+MEMORY_SLACK = 64 * 1024
+# per item time of a case can grow this much when the corpus is 8 times larger
+SCALING_TOLERANCE = 2.0
+GENERATED_ITEMS = 1000
+REPEAT = 3
+
+WORDS = (
+    "la fonction renvoie une liste de paramètres pour le module "
+    "avec un tuple et un itérateur ou une exception si nécessaire"
+).split()
+MARKUP = (
+    "``None``",
+    ":func:`len`",
+    ":class:`dict`",
+    "*args*",
+    "**important**",
+    "`Python <https://www.python.org>`_",
+    "« guillemets »",
+    "«mal»",
+    "voici :",
+    "pourquoi?",
+    "section_",
+)
+ENGLISH_WORDS = (
+    "the function returns a list of parameters for the module "
+    "with a tuple and an iterator or an exception if needed"
+).split()
+
+
+def generated_corpus(items: int = GENERATED_ITEMS) -> str:
+    """Return the content of a `*.po` file with various (random) items."""
+    rng = random.Random(0)
+    entries = ['msgid ""\nmsgstr ""\n"Language: fr\\n"\n']
+    for index in range(items):
+        msgid = " ".join(
+            rng.choices(ENGLISH_WORDS + list(MARKUP), k=rng.randint(3, 40))
+        )
+        msgstr = " ".join(rng.choices(WORDS + list(MARKUP), k=rng.randint(0, 45)))
+        msgstr = msgstr.replace('"', '\\"')
+        msgid = msgid.replace('"', '\\"')
+        entry = f"#: ../Doc/library/generated.rst:{index}\n"
+        if index % 17 == 0:
+            entry += "#, fuzzy\n"
+        entry += f'msgid "{msgid}"\nmsgstr "{msgstr}"\n'
+        entries.append(entry)
+    return "\n".join(entries)
+
+
+def short_corpus(items: int) -> str:
+    """Return the content of a `*.po` file with short items (all different)."""
+    return "\n".join(
+        f'#: ../Doc/library/short.rst:{index}\nmsgid "Item {index}"\n'
+        f'msgstr "Entrée {index}"\n'
+        for index in range(items)
+    )
+
+
+def corpus() -> str:
+    """Return the content of the test corpora followed by a generated corpus."""
+    contents = [
+        path.read_text(encoding="utf8")
+        for path in sorted(TESTS_DIR.glob("po_with*/*.po"))
+    ]
+    # keep only the items of the test files (headers are not repeated)
+    contents = [
+        re.sub(r"\A.*?(?=^#: )", "", text, flags=re.S | re.M) for text in contents
+    ]
+    return generated_corpus() + "\n" + "\n".join(contents)
+
+
+def calibration() -> float:
+    """Return the time of a fixed workload, best of several runs."""
+    pattern = re.compile(r"(\w+)\s(\w+)")
+    text = "calibration of the speed of this machine " * 20
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(2000):
+            pattern.sub(r"\2 \1", text).split()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_file(checker_class):
+    """Return a case running a checker on a fresh `PoFile`."""
+
+    def setup(content):
+        return checker_class(), PoFile.from_string(content)
+
+    def action(arguments):
+        checker, pofile = arguments
+        checker.check_file(pofile)
+
+    return setup, action
+
+
+def rst2txt_case():
+    """Return a case rendering the text of all the items."""
+
+    def setup(content):
+        return [
+            item.msgstr_full_content for item in PoFile.from_string(content).content
+        ]
+
+    def action(texts):
+        for text in texts:
+            PoItem.rst2txt(text)
+
+    return setup, action
+
+
+CASES = {
+    "parse": (lambda content: content, PoFile.from_string),
+    "rst2txt": rst2txt_case(),
+    "empty": check_file(EmptyChecker),
+    "fuzzy": check_file(FuzzyChecker),
+    "glossary": check_file(GlossaryChecker),
+    "grammalecte-prefilter": check_file(GrammalecteChecker),
+    "line-length": check_file(LineLengthChecker),
+    "nbsp": check_file(NonBreakableSpaceChecker),
+}
+
+
+def best_time(setup, action, content) -> float:
+    """Return the best time of several runs of a case."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        arguments = setup(content)
+        start = time.perf_counter()
+        action(arguments)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(scope="module")
+def measures():
+    """Measures of all the cases, stored as baselines when asked to."""
+    results = {}
+    yield results
+    if UPDATE_BASELINES and results:
+        baselines = {}
+        if BASELINES_PATH.exists():
+            baselines = json.loads(BASELINES_PATH.read_text(encoding="utf8"))
+        baselines.update(results)
+        BASELINES_PATH.write_text(
+            json.dumps(dict(sorted(baselines.items())), indent=2) + "\n",
+            encoding="utf8",
+        )
+
+
+@pytest.fixture(scope="module")
+def content():
+    """Content of the corpus."""
+    return corpus()
+
+
+@pytest.fixture(scope="module")
+def reference_time():
+    """Time of the calibration workload."""
+    return calibration()
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_performance(case, content, reference_time, measures, monkeypatch):
+    """Time and memory per item do not regress."""
+    monkeypatch.setattr(grammalecte, "grammalecte_text", lambda text: iter(()))
+    setup, action = CASES[case]
+    items = len(PoFile.from_string(content).content)
+    best = best_time(setup, action, content)
+    arguments = setup(content)
+    tracemalloc.start()
+    try:
+        action(arguments)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    measure = {"cost": best / reference_time / items, "memory": peak / items}
+    measures[case] = measure
+    if UPDATE_BASELINES:
+        return
+    baselines = json.loads(BASELINES_PATH.read_text(encoding="utf8"))
+    if case not in baselines:
+        pytest.skip(f"no baseline for {case}, run with PADPO_UPDATE_BASELINES=1")
+    baseline = baselines[case]
+    assert measure["cost"] <= baseline["cost"] * TIME_TOLERANCE, (
+        f"{case} is slower: {items / best:.0f} items/s, "
+        f"{measure['cost'] / baseline['cost']:.1f}x the baseline time"
+    )
+    memory_limit = baseline["memory"] * MEMORY_TOLERANCE * items + MEMORY_SLACK
+    assert peak <= memory_limit, (
+        f"{case} uses more memory: {peak} bytes, "
+        f"{measure['memory'] / baseline['memory']:.1f}x the baseline memory"
+    )
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_scaling(case, monkeypatch):
+    """
+    Time is proportional to the number of items.
+
+    Items are short, so that a cost growing faster than the number of items
+    (like a lookup in a list of the previous items) is not hidden.
+    """
+    monkeypatch.setattr(grammalecte, "grammalecte_text", lambda text: iter(()))
+    setup, action = CASES[case]
+    small = best_time(setup, action, short_corpus(1000))
+    large = best_time(setup, action, short_corpus(8000))
+    assert large / 8 <= small * SCALING_TOLERANCE, (
+        f"{case} does not scale: {large / small:.1f}x slower with 8x more items"
+    )
@@ -0,0 +1,141 @@
+"""Test parsing of `*.po` files."""
+
+import io
+import sys
+from pathlib import Path
+
+from padpo.checkers import checkers, checkers_for_language
+from padpo.checkers.nbsp import NonBreakableSpaceChecker
+from padpo.padpo import (
+    check_paths,
+    check_pofile,
+    parse_and_check,
+    parse_and_quick_check,
+)
+from padpo.pofile import PoFile
+
+PO_DIR = Path(__file__).parent / "po_without_warnings"
+
+
+def test_headers():
+    """The header entry is parsed, and is not an item."""
+    pofile = PoFile(PO_DIR / "language_de.po")
+    assert pofile.language == "de"
+    assert pofile.headers["Content-Type"] == "text/plain; charset=UTF-8"
+    assert len(pofile.content) == 1
+
+
+def test_checkers_for_language():
+    """French checkers are run only on French (or unknown language) files."""
+    assert checkers_for_language("") == checkers
+    assert checkers_for_language("fr_FR") == checkers
+    german_checkers = checkers_for_language("de")
+    assert german_checkers
+    assert not any(
+        isinstance(checker, NonBreakableSpaceChecker) for checker in german_checkers
+    )
+
+
+def test_from_bytes_string_and_stream():
+    """Content parsed from memory gives the same items as the file."""
+    path = PO_DIR / "nbsp.po"
+    expected = [str(item) for item in PoFile(path).content]
+    content = path.read_bytes()
+    for pofile in (
+        PoFile.from_bytes(content),
+        PoFile.from_string(content.decode("utf8")),
+        PoFile.from_stream(io.StringIO(content.decode("utf8"))),
+    ):
+        assert [str(item) for item in pofile.content] == expected
+
+
+def test_stdin(monkeypatch):
+    """`-` input path is the standard input."""
+    content = (PO_DIR.parent / "po_with_warnings" / "tuple.po").read_bytes()
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(content)))
+    errors, warnings = check_paths(["-"])
+    assert not errors
+    assert len(warnings) == 1
+
+
+def test_quick_check(tmp_path):
+    """Quick checkers give the same messages while parsing, other are not run."""
+    path = tmp_path / "quick.po"
+    path.write_text(
+        "#: a.rst:1\n"
+        'msgid "Empty"\n'
+        'msgstr ""\n'
+        "\n"
+        "#: a.rst:2\n"
+        "#, fuzzy\n"
+        'msgid "Fuzzy"\n'
+        'msgstr "Flou"\n'
+        "\n"
+        "#: a.rst:3\n"
+        'msgid "Fine"\n'
+        'msgstr "Bien"\n'
+        "\n"
+        "#: a.rst:4\n"
+        'msgid "Long"\n'
+        'msgstr "' + "long " * 20 + '"\n',
+        encoding="utf8",
+    )
+    quick_names = {checker.name for checker in checkers if checker.quick}
+    expected = [
+        (item.lineno_start, message.text)
+        for item in parse_and_check(path).content
+        for message in item.warnings
+        if message.checker_name in quick_names
+    ]
+    assert len(expected) == 3
+    pofile = parse_and_quick_check(path)
+    assert len(pofile.content) == 3  # items without messages are not kept
+    assert [
+        (item.lineno_start, message.text)
+        for item in pofile.content
+        for message in item.warnings
+    ] == expected
+
+
+def test_lines_in_diff():
+    """Added lines, and lines before pure deletions, are modified lines."""
+    diff = (
+        "@@ -1 +1 @@\n"
+        "-old\n"
+        "+new\n"
+        "@@ -8,5 +8,4 @@ msgstr\n"
+        " context\n"
+        " context\n"
+        "-removed\n"
+        " context\n"
+        " context\n"
+        "@@ -20,2 +19,3 @@\n"
+        " context\n"
+        "+added\n"
+        " last\n"
+        "\\ No newline at end of file\n"
+    )
+    assert list(PoFile.lines_in_diff(diff)) == [1, 9, 20]
+    # only "\n" separates lines (not U+2028, form feed…)
+    diff = '@@ -1,3 +1,3 @@\n msgid "a\u2028b\x0c"\n-msgstr "x"\n+msgstr "y"\n'
+    assert list(PoFile.lines_in_diff(diff)) == [2]
+
+
+def test_check_changed_items_only(tmp_path):
+    """With a diff, only the items changed by the diff are checked."""
+    path = tmp_path / "changed.po"
+    path.write_text(
+        "#: a.rst:1\n"
+        'msgid "First"\n'
+        'msgstr ""\n'
+        "\n"
+        "#: a.rst:2\n"
+        'msgid "Second"\n'
+        'msgstr ""\n',
+        encoding="utf8",
+    )
+    pofile = PoFile(path)
+    pofile.diff = '@@ -5,3 +5,3 @@\n #: a.rst:2\n-msgid "Old"\n+msgid "Second"\n'
+    assert [item.lineno_start for item in pofile.items_at_lines([3, 4, 5])] == [1, 5]
+    check_pofile(pofile)
+    assert [len(item.warnings) for item in pofile.content] == [0, 1]
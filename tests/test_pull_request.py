@@ -0,0 +1,52 @@
+"""Test the check of pull requests (GitHub API calls are replaced)."""
+
+import asyncio
+import logging
+
+from padpo import padpo
+from padpo.checkers import checkers
+from padpo.snapshot import SnapshotStore
+
+CONTENT = (
+    "#: library/a.rst:1\n"
+    'msgid "Why?"\n'
+    'msgstr "Pourquoi?"\n'
+    "\n"
+    "#: library/a.rst:2\n"
+    'msgid "What?"\n'
+    'msgstr "Quoi?"\n'
+).encode("utf8")
+# the second entry is changed by the pull request
+PATCH = '@@ -5,3 +5,3 @@\n #: library/a.rst:2\n-msgid "What"\n+msgid "What?"\n'
+FILEINFOS = [
+    {"filename": "library/a.po", "sha": "0123456789abcdef", "patch": PATCH},
+    {"filename": "README.rst", "sha": "1123456789abcdef", "patch": "@@ -1 +1 @@\n"},
+    {"filename": "library/big.po", "sha": "2123456789abcdef"},  # no patch
+]
+
+
+def test_check_pull_request(monkeypatch, tmp_path, caplog):
+    """Changed `*.po` files are checked once, only changed entries are reported."""
+    downloads = []
+
+    def download_file(fileinfo):
+        downloads.append(fileinfo["filename"])
+        return CONTENT
+
+    monkeypatch.setattr(padpo, "pull_request_file_list", lambda _: FILEINFOS)
+    monkeypatch.setattr(padpo, "download_file", download_file)
+    store = SnapshotStore(tmp_path, checkers)
+    for _ in range(2):
+        caplog.clear()
+        errors, warnings = asyncio.run(
+            padpo.check_pull_request("owner/repository/pull/1", store)
+        )
+        assert len(errors) == 1
+        assert not warnings
+        records = [
+            record for record in caplog.records if record.levelno >= logging.ERROR
+        ]
+        assert [(record.pofile, record.poline) for record in records] == [
+            ("library/a.po", 5)
+        ]
+    assert downloads == ["library/a.po"]  # the second run uses the snapshot
@@ -0,0 +1,57 @@
+"""Test the sharding of directory runs."""
+
+import argparse
+from pathlib import Path
+
+import pytest
+
+from padpo.padpo import check_paths, merge
+from padpo.shard import (
+    ItemCountIndex,
+    ShardResults,
+    missing_shards,
+    parse_shard,
+    select_shard,
+)
+
+PO_FILES = sorted(Path(__file__).parent.rglob("*.po"))
+
+
+def test_parse_shard():
+    """Shards are given as K/N."""
+    assert parse_shard("2/3") == (2, 3)
+    for value in ("0/3", "4/3", "2", "a/b"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_select_shard(tmp_path):
+    """Shards are a balanced partition of the files."""
+    index = ItemCountIndex(tmp_path / "item_counts.json")
+    shards = [select_shard(PO_FILES, shard, 3, index) for shard in (1, 2, 3)]
+    assert sorted(path for shard in shards for path in shard) == PO_FILES
+    loads = [sum(index.count(path) + 1 for path in shard) for shard in shards]
+    heaviest = max(index.count(path) + 1 for path in PO_FILES)
+    assert max(loads) - min(loads) <= heaviest
+    index.save()
+    assert ItemCountIndex(tmp_path / "item_counts.json")._counts == index._counts
+
+
+def test_merge(tmp_path):
+    """Merged results of all shards give the messages of a single run."""
+    index = ItemCountIndex()
+    paths = []
+    for shard in (1, 2):
+        output = ShardResults(f"{shard}/2")
+        check_paths(select_shard(PO_FILES, shard, 2, index), output=output)
+        paths.append(tmp_path / f"shard{shard}.json")
+        output.write(paths[-1])
+    results = [ShardResults.read(path) for path in paths]
+    assert sorted(path for result in results for path in result.files) == [
+        str(path) for path in PO_FILES
+    ]
+    assert not missing_shards(results)
+    assert missing_shards(results[:1]) == ["2/2"]
+    with pytest.raises(SystemExit):
+        merge([str(paths[0])])  # missing shard
+    merge([str(path) for path in paths])  # only warnings: no exit
@@ -0,0 +1,72 @@
+"""Test the snapshot store of pull request results."""
+
+import importlib.metadata
+from pathlib import Path
+
+from padpo.checkers import checkers
+from padpo.pofile import Error, PoFile
+from padpo.snapshot import SnapshotStore, checkers_fingerprint
+
+PO_FILE = Path(__file__).parent / "po_with_warnings" / "tuple.po"
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Results stored for a blob are given back for the same blob."""
+    store = SnapshotStore(tmp_path, checkers)
+    pofile = PoFile(PO_FILE)
+    pofile.content[0].add_error("Glossary", "bad {}", "translation", rule="glossary")
+    pofile.content[0].add_warning("Fuzzy", "fuzzy entry")
+    store.save("0123456789abcdef", pofile)
+
+    restored = store.load("0123456789abcdef", "restored.po")
+    assert restored.path == "restored.po"
+    assert len(restored.content) == 1
+    item = restored.content[0]
+    assert item.msgid_full_content == pofile.content[0].msgid_full_content
+    assert item.msgstr_full_content == pofile.content[0].msgstr_full_content
+    assert item.lineno_start == pofile.content[0].lineno_start
+    assert item.lineno_end == pofile.content[0].lineno_end
+    assert [(type(m), m.checker_name, m.rule, m.text) for m in item.warnings] == [
+        (Error, "Glossary", "glossary", "bad translation"),
+        (type(pofile.content[0].warnings[1]), "Fuzzy", "", "fuzzy entry"),
+    ]
+    errors, warnings = restored.display_warnings()
+    assert len(errors) == 1
+    assert len(warnings) == 1
+
+
+def test_snapshot_unknown_blob(tmp_path):
+    """Unknown blobs have no snapshot."""
+    store = SnapshotStore(tmp_path, checkers)
+    assert store.load("fedcba9876543210", "file.po") is None
+
+
+def test_snapshot_coverage(tmp_path):
+    """Results checked for a diff are not given back for a larger diff."""
+    store = SnapshotStore(tmp_path, checkers)
+    pofile = PoFile.from_string(
+        '#: a.rst:1\nmsgid "A"\nmsgstr "A"\n\n#: a.rst:2\nmsgid "B"\nmsgstr "B"\n'
+    )
+    pofile.diff = '@@ -3 +3 @@\n-msgstr ""\n+msgstr "A"\n'
+    store.save("0123456789abcdef", pofile)
+    assert store.load("0123456789abcdef", "file.po", pofile.diff) is not None
+    assert store.load("0123456789abcdef", "file.po") is None
+
+
+def test_snapshot_unknown_format(tmp_path):
+    """Snapshots in another format are ignored."""
+    store = SnapshotStore(tmp_path, checkers)
+    snapshot_path = store._snapshot_path("0123456789abcdef")
+    snapshot_path.parent.mkdir(parents=True)
+    snapshot_path.write_text('{"items": [[1, 4, "old format"]]}', encoding="utf8")
+    assert store.load("0123456789abcdef", "file.po") is None
+
+
+def test_fingerprint_without_metadata(monkeypatch):
+    """Fingerprints do not need padpo to be installed."""
+
+    def version(name):
+        raise importlib.metadata.PackageNotFoundError(name)
+
+    monkeypatch.setattr(importlib.metadata, "version", version)
+    assert checkers_fingerprint(checkers)
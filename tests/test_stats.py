@@ -0,0 +1,45 @@
+"""Test statistics on checked files."""
+
+from pathlib import Path
+
+from padpo.checkers.grammalecte import GrammalecteChecker
+from padpo.pofile import PoFile
+from padpo.stats import Statistics
+
+PO_DIR = Path(__file__).parent / "po_without_warnings"
+
+
+def test_statistics_counts():
+    """Items and messages are counted by checker, file and directory."""
+    statistics = Statistics()
+    for path in sorted(PO_DIR.glob("*.po")):
+        pofile = PoFile(path)
+        pofile.content[0].add_error("NBSP", "missing non-breakable space")
+        pofile.content[0].add_warning("Fuzzy", "fuzzy entry")
+        statistics.add_file(pofile)
+    nb_files = len(list(PO_DIR.glob("*.po")))
+
+    assert statistics.checkers["NBSP"] == {"errors": nb_files, "warnings": 0}
+    assert statistics.checkers["Fuzzy"] == {"errors": 0, "warnings": nb_files}
+    assert statistics.directories[str(PO_DIR)]["errors"] == nb_files
+    assert statistics.total["items"] == statistics.total["translated"]
+    assert statistics.files[str(PO_DIR / "abc.po")]["warnings"] == 1
+    assert "NBSP" in statistics.to_table()
+    assert '"NBSP"' in statistics.to_json()
+
+
+def test_statistics_timings():
+    """Timed checkers give their slowest files and their overruns."""
+    checker = GrammalecteChecker()
+    checker.timings = {"fast.po": 0.5, "slow.po": 12.0}
+    checker.overruns = {"slow.po": "time budget exceeded (10 s)"}
+    statistics = Statistics()
+    statistics.add_timings(checker)
+    assert statistics.slowest_files("Grammalecte") == [
+        ("slow.po", 12.0),
+        ("fast.po", 0.5),
+    ]
+    assert statistics.as_dict()["timings"]["Grammalecte"]["overruns"] == {
+        "slow.po": "time budget exceeded (10 s)"
+    }
+    assert "not checked: time budget exceeded" in statistics.to_table()
@@ -0,0 +1,69 @@
+"""Test the suppression of rules per file and per entry."""
+
+from pathlib import Path
+
+from padpo.checkers.baseclass import Checker
+from padpo.checkers.nbsp import NonBreakableSpaceChecker
+from padpo.pofile import PoFile, PoItem
+from padpo.suppressions import SuppressionIndex
+
+PO_FILE = Path(__file__).parent / "po_without_warnings" / "ignored.po"
+
+
+def test_inline_comment():
+    """Rules of `#. padpo: ignore=` comments are ignored for the item."""
+    pofile = PoFile(PO_FILE)
+    assert pofile.content[0].ignored_rules == {"glossary", "nbsp-punctuation"}
+
+
+def test_suppression_file(tmp_path):
+    """Rules of suppression files are ignored for matching files and items."""
+    suppression_file = tmp_path / "suppressions.txt"
+    suppression_file.write_text(
+        "# comment\n"
+        "po_without_warnings/ignored.po:4 nbsp\n"
+        "*.po fuzzy\n"
+        "other.po empty\n",
+        encoding="utf8",
+    )
+    suppressions = SuppressionIndex()
+    suppressions.load(suppression_file)
+    pofile = PoFile(PO_FILE)
+    suppressions.apply(pofile)
+    item = pofile.content[0]
+    assert item.ignored_rules == {"glossary", "nbsp-punctuation", "nbsp", "fuzzy"}
+    assert NonBreakableSpaceChecker().is_ignored(item)
+
+
+def test_inline_comment_wrapped_references():
+    """Rules are kept when the references of the item span several lines."""
+    pofile = PoFile.from_string(
+        "#. padpo: ignore=nbsp\n"
+        "#: ../Doc/library/a_very_long_file_name.rst:12\n"
+        "#: ../Doc/library/another_very_long_file_name.rst:34\n"
+        'msgid "Why?"\n'
+        'msgstr "Pourquoi?"\n'
+    )
+    assert len(pofile.content) == 1
+    item = pofile.content[0]
+    assert item.ignored_rules == {"nbsp"}
+    assert (item.lineno_start, item.lineno_end) == (2, 5)
+    NonBreakableSpaceChecker().check_file(pofile)
+    assert not item.warnings
+
+
+def test_checker_without_rules():
+    """Checkers without rules are ignored by their code only."""
+
+    class NoRulesChecker(Checker):
+        code = "no-rules"
+
+        def check_item(self, item):
+            pass
+
+    item = PoItem("#: a.rst:1", 1)
+    checker = NoRulesChecker()
+    item.ignored_rules = frozenset({"glossary"})
+    assert not checker.is_ignored(item)
+    item.ignored_rules = frozenset({"no-rules"})
+    assert checker.is_ignored(item)